@@ -0,0 +1,265 @@
+"""Offline benchmark for the ingest and send pipeline.
+
+Generates synthetic RSS/Atom feeds, serves them from a local HTTP server and
+delivers mail to a local SMTP sink, so results are reproducible and need no
+network access. Timings are written as JSON for comparison between releases.
+
+Usage:
+    python -m src.benchmark --feeds 50 --entries 200 --output bench.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rss_email.config import Settings, _build_url_maps
+from src.rss_email.db import create_session_factory
+from src.rss_email.email_client import EmailClient
+from src.rss_email.render import fragment_cache
+from src.rss_email.rss_client import fetch_feed
+from src.rss_email.workflow import (
+    _build_email_html,
+    _build_email_text,
+    _get_unsent_recent,
+    ingest_feeds,
+    send_unsent,
+)
+from src.smtp_sink import make_server as make_smtp_sink
+
+
+def make_feed(name: str, entries: int, fmt: str = "rss", summary_words: int = 120) -> bytes:
+    start = datetime(2024, 1, 1)
+    summary = " ".join(f"word{i}" for i in range(summary_words))
+    items = []
+    for i in range(entries):
+        published = start + timedelta(hours=i)
+        link = f"https://example.org/{name}/paper-{i}"
+        if fmt == "atom":
+            items.append(
+                f"<entry><title>{name} paper {i}</title><id>urn:{name}:{i}</id>"
+                f"<link rel='alternate' href='{link}'/><published>{published.isoformat()}Z</published>"
+                f"<author><name>Author {i}</name></author><summary>{summary}</summary></entry>"
+            )
+        else:
+            items.append(
+                f"<item><title>{name} paper {i}</title><guid isPermaLink='false'>{name}-{i}</guid>"
+                f"<link>{link}</link><pubDate>{published.strftime('%a, %d %b %Y %H:%M:%S')} GMT</pubDate>"
+                f"<dc:creator>Author {i}</dc:creator><description>{summary}</description></item>"
+            )
+    if fmt == "atom":
+        doc = f"<feed xmlns='http://www.w3.org/2005/Atom'><title>{name}</title>{''.join(items)}</feed>"
+    else:
+        doc = (
+            "<rss version='2.0' xmlns:dc='http://purl.org/dc/elements/1.1/'>"
+            f"<channel><title>{name}</title>{''.join(items)}</channel></rss>"
+        )
+    return ("<?xml version='1.0' encoding='utf-8'?>" + doc).encode("utf-8")
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    feeds: Dict[str, bytes] = {}
+
+    def do_GET(self):
+        body = self.feeds.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start(server) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+@contextlib.contextmanager
+def _quiet():
+    # The client logs progress and SMTP debug output; keep it out of timings.
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+
+
+def _summarize(samples: List[float], items: int = 0) -> dict:
+    ordered = sorted(samples)
+    total = sum(ordered)
+    result = {
+        "runs": len(ordered),
+        "total_s": round(total, 6),
+        "mean_s": round(statistics.fmean(ordered), 6),
+        "p50_s": round(ordered[len(ordered) // 2], 6),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "max_s": round(ordered[-1], 6),
+    }
+    if items and total:
+        result["items"] = items
+        result["items_per_s"] = round(items / total, 2)
+    return result
+
+
+def _time(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(args) -> dict:
+    names = [f"feed{i}" for i in range(args.feeds)]
+    _FeedHandler.feeds = {f"/{n}.xml": make_feed(n, args.entries, args.format) for n in names}
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+    http.daemon_threads = True
+    smtp = make_smtp_sink()
+    _start(http)
+    _start(smtp)
+    base = f"http://127.0.0.1:{http.server_address[1]}"
+
+    groups: Dict[str, List[str]] = {}
+    for i, n in enumerate(names):
+        groups.setdefault(f"Group {i % args.groups}", []).append(f"{base}/{n}.xml")
+    url_to_group, urls = _build_url_maps(groups)
+    recipients = {g: {"to": ["bench@example.org"], "cc": [], "bcc": []} for g in [*groups, "Default"]}
+
+    workdir = tempfile.mkdtemp(prefix="rss_bench_")
+    settings = Settings(
+        rss_urls=urls,
+        rss_groups=groups,
+        url_to_group=url_to_group,
+        group_recipients=recipients,
+        database_url=f"sqlite:///{workdir}/bench.db",
+        smtp_host="127.0.0.1",
+        smtp_port=smtp.server_address[1],
+        smtp_user="",
+        smtp_pass="",
+        smtp_sender="bench@example.org",
+        mail_subject_prefix="[Bench]",
+        batch_limit=args.batch_limit,
+        enable_schedule=False,
+        schedule_time="08:30",
+        schedule_tz="UTC",
+        fetch_workers=args.fetch_workers,
+        feed_parser=args.parser,
+        parse_workers=args.parse_workers,
+        sqlite_tuning=args.sqlite_tuning,
+        http_keepalive=not args.no_keepalive,
+        smtp_starttls=False,
+    )
+    SessionLocal = create_session_factory(settings.database_url, sqlite_tuning=args.sqlite_tuning)
+    email_client = EmailClient(
+        settings.smtp_host, settings.smtp_port, "", "", settings.smtp_sender, starttls=False
+    )
+    results: Dict[str, dict] = {}
+    total_entries = args.feeds * args.entries
+
+    with _quiet():
+        results["fetch_feed"] = _summarize(
+            _time(lambda: fetch_feed(urls[0]), args.repeat), items=args.entries * args.repeat
+        )
+
+        with SessionLocal() as session:
+            cold = _time(lambda: ingest_feeds(settings, session), 1)
+            warm = _time(lambda: ingest_feeds(settings, session), args.repeat)
+        results["ingest_feeds_cold"] = _summarize(cold, items=total_entries)
+        results["ingest_feeds_warm"] = _summarize(warm)
+
+        with SessionLocal() as session:
+            results["get_unsent_recent"] = _summarize(
+                _time(lambda: _get_unsent_recent(session), args.repeat)
+            )
+            batch = _get_unsent_recent(session)[: args.batch_limit or None]
+            rendered = len(batch) * args.repeat
+            for name, build in (("build_email_html", _build_email_html), ("build_email_text", _build_email_text)):
+                # Cold renders every paper; warm only reuses cached fragments.
+                cold = _time(lambda: (fragment_cache.clear(), build(batch, "Group 0")), args.repeat)
+                warm = _time(lambda: build(batch, "Group 0"), args.repeat)
+                results[name] = _summarize(cold, items=rendered)
+                results[f"{name}_warm"] = _summarize(warm, items=rendered)
+
+        with SessionLocal() as session:
+            # A fresh cycle per run; within one cycle a group's digest is sent only once.
+            cycles = itertools.count()
+            sends = _time(
+                lambda: send_unsent(settings, session, email_client, cycle=f"bench-{next(cycles)}"), args.repeat
+            )
+        results["send_unsent"] = _summarize(sends, items=args.groups * args.repeat)
+
+    http.shutdown()
+    smtp.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "messages_delivered": smtp.messages,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the RSS ingest and send pipeline offline.")
+    parser.add_argument("--feeds", type=int, default=20, help="number of synthetic feeds")
+    parser.add_argument("--entries", type=int, default=100, help="entries per feed")
+    parser.add_argument("--groups", type=int, default=4, help="number of groups the feeds are split across")
+    parser.add_argument("--format", choices=["rss", "atom"], default="rss")
+    parser.add_argument("--parser", choices=["feedparser", "stream"], default="feedparser")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=0, help="parser processes (0 = in-process)")
+    parser.add_argument("--sqlite-tuning", action="store_true", help="WAL and pragmas, single writer connection")
+    parser.add_argument("--no-keepalive", action="store_true", help="open a new connection for every feed")
+    parser.add_argument("--batch-limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file to write")
+    args = parser.parse_args()
+
+    report = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'stage':<22}{'mean (s)':>12}{'p95 (s)':>12}{'items/s':>12}")
+    for stage, r in report["results"].items():
+        print(f"{stage:<22}{r['mean_s']:>12.4f}{r['p95_s']:>12.4f}{r.get('items_per_s', ''):>12}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,20 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from src.rss_email.config import get_settings
-from src.rss_email.db import create_session_factory
+from src.rss_email.db import create_session_factory, sync_sources
 from src.rss_email.email_client import EmailClient
-from src.rss_email.workflow import run_cycle
+from src.rss_email.health import disabled_report
+from src.rss_email.metrics import create_sink
+from src.rss_email.polling import poll_due_feeds
+from src.rss_email.workflow import deliver_outbox, run_cycle, send_unsent
+
+
+def report_disabled_feeds(session) -> None:
+    lines = disabled_report(session)
+    if lines:
+        print(f"[WARNING] {len(lines)} feeds disabled after repeated failures:")
+        for line in lines:
+            print(f"  - {line}")
 
 
 def main() -> None:
@@ -23,19 +34,26 @@ def main() -> None:
         print("SMTP settings are incomplete; set SMTP_* to send mail.")
         return
 
-    SessionLocal = create_session_factory(settings.database_url)
+    SessionLocal = create_session_factory(settings.database_url, sqlite_tuning=settings.sqlite_tuning)
+    with SessionLocal() as session:
+        sync_sources(session, settings.rss_groups)
     email_client = EmailClient(
         settings.smtp_host,
         settings.smtp_port,
         settings.smtp_user,
         settings.smtp_pass,
         settings.smtp_sender,
+        max_messages_per_connection=settings.smtp_max_messages_per_connection,
+        starttls=settings.smtp_starttls,
     )
+    metrics = create_sink(settings.metrics_sink)
 
     if settings.enable_schedule:
         try:
+            from apscheduler.executors.pool import ThreadPoolExecutor
             from apscheduler.schedulers.blocking import BlockingScheduler
             from apscheduler.triggers.cron import CronTrigger
+            from apscheduler.triggers.interval import IntervalTrigger
             from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
             try:
                 from zoneinfo import ZoneInfo
@@ -44,6 +62,8 @@ def main() -> None:
                 tz = None
 
             scheduler = BlockingScheduler(
+                # One worker: polling and digest jobs never write to the database at once
+                executors={"default": ThreadPoolExecutor(1)},
                 timezone=tz,
                 coalesce=True,
                 max_instances=1,
@@ -70,7 +90,7 @@ def main() -> None:
                 print(f"[{start_time.strftime('%Y-%m-%d %H:%M:%S')}] Starting scheduled job...")
                 try:
                     with SessionLocal() as session:
-                        result = run_cycle(settings, session, email_client)
+                        result = run_cycle(settings, session, email_client, metrics)
                         sent = result.get("sent", 0)
                         groups = result.get("groups", 0)
                         end_time = datetime.now()
@@ -81,41 +101,118 @@ def main() -> None:
                             f"Ingested {result['ingested']} new items; "
                             f"sent {sent} papers across {groups} groups."
                         )
+                        if result.get("failed"):
+                            print(f"[WARNING] Delivery failed for groups: {', '.join(result['failed'])}")
+                        report_disabled_feeds(session)
                 except Exception as e:
                     end_time = datetime.now()
                     duration = (end_time - start_time).total_seconds()
                     print(f"[{end_time.strftime('%Y-%m-%d %H:%M:%S')}] Job failed after {duration:.2f}s: {e}")
                     raise
 
+            def job_poll():
+                try:
+                    with SessionLocal() as session:
+                        ingested = poll_due_feeds(settings, session, metrics)
+                    if ingested:
+                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Polled feeds: {ingested} new items.")
+                finally:
+                    metrics.flush()
+
+            def job_digest():
+                start_time = datetime.now()
+                print(f"[{start_time.strftime('%Y-%m-%d %H:%M:%S')}] Starting digest job...")
+                try:
+                    with SessionLocal() as session:
+                        result = send_unsent(settings, session, email_client, metrics)
+                        report_disabled_feeds(session)
+                    duration = (datetime.now() - start_time).total_seconds()
+                    print(
+                        f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] "
+                        f"Completed in {duration:.2f}s: "
+                        f"sent {result['sent']} papers across {result['groups']} groups."
+                    )
+                    if result.get("failed"):
+                        print(f"[WARNING] Delivery failed for groups: {', '.join(result['failed'])}")
+                finally:
+                    metrics.flush()
+
+            def job_outbox():
+                # Retries digests whose earlier delivery failed, once their backoff is over.
+                try:
+                    with SessionLocal() as session:
+                        result = deliver_outbox(settings, session, email_client, metrics)
+                    if result["groups"]:
+                        print(
+                            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Outbox retry: "
+                            f"sent {result['sent']} papers across {result['groups'] - len(result['failed'])} groups."
+                        )
+                finally:
+                    metrics.flush()
+
             # Add event listeners for monitoring
             def job_listener(event):
                 if event.exception:
                     print(f"[SCHEDULER ERROR] Job crashed: {event.exception}")
                 elif event.code == EVENT_JOB_MISSED:
                     print(f"[SCHEDULER WARNING] Job was missed at {datetime.now()}")
-                elif event.code == EVENT_JOB_EXECUTED:
+                elif event.code == EVENT_JOB_EXECUTED and event.job_id not in ("poll_feeds", "deliver_outbox"):
                     print(f"[SCHEDULER INFO] Job executed successfully")
 
             scheduler.add_listener(job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
 
-            # Schedule daily execution at the specified time
             scheduler.add_job(
-                job_full_cycle,
-                trigger=CronTrigger(hour=hour, minute=minute, timezone=tz),
-                id="daily_cycle",
-                misfire_grace_time=3600,
+                job_outbox,
+                trigger=IntervalTrigger(minutes=1, timezone=tz),
+                id="deliver_outbox",
                 coalesce=True,
                 max_instances=1
             )
 
-            print(
-                f"Scheduler running. Daily execution at {hour:02d}:{minute:02d} "
-                f"(timezone={settings.schedule_tz})."
-            )
-            print("Starting immediately for first run...")
-
-            # Run immediately on startup
-            job_full_cycle()
+            if settings.schedule_mode == "adaptive":
+                # Each feed is fetched when due on its own interval (checked every
+                # minute); digests still go out once a day at SCHEDULE_TIME.
+                scheduler.add_job(
+                    job_poll,
+                    trigger=IntervalTrigger(minutes=1, timezone=tz),
+                    id="poll_feeds",
+                    coalesce=True,
+                    max_instances=1
+                )
+                scheduler.add_job(
+                    job_digest,
+                    trigger=CronTrigger(hour=hour, minute=minute, timezone=tz),
+                    id="daily_digest",
+                    misfire_grace_time=3600,
+                    coalesce=True,
+                    max_instances=1
+                )
+                print(
+                    f"Scheduler running. Adaptive feed polling every "
+                    f"{settings.poll_min_minutes}-{settings.poll_max_minutes} min; "
+                    f"daily digest at {hour:02d}:{minute:02d} (timezone={settings.schedule_tz})."
+                )
+                print("Polling due feeds immediately for first run...")
+                job_poll()
+            else:
+                # Schedule daily execution at the specified time
+                scheduler.add_job(
+                    job_full_cycle,
+                    trigger=CronTrigger(hour=hour, minute=minute, timezone=tz),
+                    id="daily_cycle",
+                    misfire_grace_time=3600,
+                    coalesce=True,
+                    max_instances=1
+                )
+
+                print(
+                    f"Scheduler running. Daily execution at {hour:02d}:{minute:02d} "
+                    f"(timezone={settings.schedule_tz})."
+                )
+                print("Starting immediately for first run...")
+
+                # Run immediately on startup
+                job_full_cycle()
 
             print("Scheduler started. Waiting for next scheduled run...")
             scheduler.start()
@@ -125,12 +222,15 @@ def main() -> None:
 
     # Fallback: one-off run
     with SessionLocal() as session:
-        result = run_cycle(settings, session, email_client)
+        result = run_cycle(settings, session, email_client, metrics)
         sent = result.get("sent", 0)
         groups = result.get("groups", 0)
         print(
             f"Ingested {result['ingested']} new items; sent {sent} papers across {groups} groups."
         )
+        if result.get("failed"):
+            print(f"[WARNING] Delivery failed for groups: {', '.join(result['failed'])}")
+        report_disabled_feeds(session)
 
 
 if __name__ == "__main__":
@@ -115,6 +115,37 @@ class Settings:
     enable_schedule: bool
     schedule_time: str
     schedule_tz: str
+    schedule_mode: str = "daily"
+    poll_min_minutes: int = 30
+    poll_max_minutes: int = 1440
+    poll_jitter: float = 0.2
+    fetch_workers: int = 8
+    fetch_per_host: int = 2
+    fetch_connect_timeout: float = 10.0
+    fetch_read_timeout: float = 30.0
+    fetch_max_bytes: int = 20 * 1024 * 1024
+    cycle_budget_seconds: int = 0
+    http_keepalive: bool = True
+    snapshot_dir: str = ""
+    snapshot_retention_days: int = 14
+    feed_parser: str = "feedparser"
+    parse_workers: int = 0
+    incremental_fetch: bool = False
+    watermark_overlap_hours: int = 48
+    ingest_commit_rows: int = 0
+    feed_failure_threshold: int = 3
+    feed_backoff_minutes: int = 60
+    feed_backoff_max_hours: int = 168
+    sqlite_tuning: bool = False
+    smtp_max_messages_per_connection: int = 0
+    smtp_starttls: bool = True
+    send_workers: int = 1
+    pipeline_queue_size: int = 16
+    summary_max_chars: int = 600
+    digest_retention_days: int = 30
+    outbox_max_attempts: int = 5
+    outbox_backoff_minutes: int = 5
+    metrics_sink: str = ""
 
 
 def get_settings() -> Settings:
@@ -141,4 +172,35 @@ def get_settings() -> Settings:
         enable_schedule=_get_bool(os.getenv("ENABLE_SCHEDULE"), False),
         schedule_time=os.getenv("SCHEDULE_TIME", "08:30"),
         schedule_tz=os.getenv("SCHEDULE_TZ", "Asia/Shanghai"),
+        schedule_mode=os.getenv("SCHEDULE_MODE", "daily").strip().lower(),
+        poll_min_minutes=int(os.getenv("POLL_MIN_MINUTES", "30")),
+        poll_max_minutes=int(os.getenv("POLL_MAX_MINUTES", "1440")),
+        poll_jitter=float(os.getenv("POLL_JITTER", "0.2")),
+        fetch_workers=int(os.getenv("FETCH_WORKERS", "8")),
+        fetch_per_host=int(os.getenv("FETCH_PER_HOST", "2")),
+        fetch_connect_timeout=float(os.getenv("FETCH_CONNECT_TIMEOUT", "10")),
+        fetch_read_timeout=float(os.getenv("FETCH_READ_TIMEOUT", "30")),
+        fetch_max_bytes=int(os.getenv("FETCH_MAX_BYTES", str(20 * 1024 * 1024))),
+        cycle_budget_seconds=int(os.getenv("CYCLE_BUDGET_SECONDS", "0")),
+        http_keepalive=_get_bool(os.getenv("HTTP_KEEPALIVE"), True),
+        snapshot_dir=os.getenv("SNAPSHOT_DIR", "").strip(),
+        snapshot_retention_days=int(os.getenv("SNAPSHOT_RETENTION_DAYS", "14")),
+        feed_parser=os.getenv("FEED_PARSER", "feedparser").strip().lower(),
+        parse_workers=int(os.getenv("PARSE_WORKERS", "0")),
+        incremental_fetch=_get_bool(os.getenv("INCREMENTAL_FETCH"), False),
+        watermark_overlap_hours=int(os.getenv("WATERMARK_OVERLAP_HOURS", "48")),
+        ingest_commit_rows=int(os.getenv("INGEST_COMMIT_ROWS", "0")),
+        feed_failure_threshold=int(os.getenv("FEED_FAILURE_THRESHOLD", "3")),
+        feed_backoff_minutes=int(os.getenv("FEED_BACKOFF_MINUTES", "60")),
+        feed_backoff_max_hours=int(os.getenv("FEED_BACKOFF_MAX_HOURS", "168")),
+        sqlite_tuning=_get_bool(os.getenv("SQLITE_TUNING"), False),
+        smtp_max_messages_per_connection=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "0")),
+        send_workers=int(os.getenv("SEND_WORKERS", "1")),
+        pipeline_queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "16")),
+        summary_max_chars=int(os.getenv("SUMMARY_MAX_CHARS", "600")),
+        digest_retention_days=int(os.getenv("DIGEST_RETENTION_DAYS", "30")),
+        outbox_max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5")),
+        outbox_backoff_minutes=int(os.getenv("OUTBOX_BACKOFF_MINUTES", "5")),
+        smtp_starttls=_get_bool(os.getenv("SMTP_STARTTLS"), True),
+        metrics_sink=os.getenv("METRICS_SINK", ""),
     )
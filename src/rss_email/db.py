@@ -1,12 +1,57 @@
 import os
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set
 
-from sqlalchemy import Boolean, Column, DateTime, String, Text, create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    create_engine,
+    event,
+    insert,
+    inspect,
+    or_,
+    delete,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
 Base = declarative_base()
 
+# Applied to every connection when SQLite tuning is on.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers no longer block the writer, or the other way round
+    "synchronous": "NORMAL",  # with WAL, durable except for the last commits on power loss
+    "mmap_size": 268435456,  # 256 MiB
+    "cache_size": -65536,  # 64 MiB (negative = KiB)
+    "busy_timeout": 5000,  # ms to wait for another process's lock before failing
+}
+
+
+class Group(Base):
+    __tablename__ = "groups"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+
+class Feed(Base):
+    __tablename__ = "feeds"
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String, nullable=False, unique=True)
+    # NULL once the URL is dropped from rss_groups.json; its papers go to "Default".
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=True)
+
 
 class Paper(Base):
     __tablename__ = "papers"
@@ -17,11 +62,77 @@ class Paper(Base):
     summary = Column(Text, default="")
     link = Column(String, nullable=False)
     published_at = Column(DateTime, nullable=True)
-    source = Column(String, default="")
+    source = Column(String, nullable=True)  # legacy feed URL; replaced by feed_id
+    feed_id = Column(Integer, ForeignKey("feeds.id"), nullable=True)
+    canonical_key = Column(String, nullable=True)  # see rss_client._canonical_key
     sent = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.now())
     inserted_at = Column(DateTime, default=datetime.now())
 
+    __table_args__ = (
+        # Serves the send phase: unsent papers inserted after a cutoff.
+        Index("ix_papers_sent_inserted_at", "sent", "inserted_at"),
+        # Serves the per-group send query and the feed_id backfill.
+        Index("ix_papers_feed_sent_inserted_at", "feed_id", "sent", "inserted_at"),
+        # Cross-feed dedup looks up every incoming entry by this key.
+        Index("ix_papers_canonical_key", "canonical_key"),
+    )
+
+    feed = relationship(Feed, lazy="selectin")
+
+    @property
+    def source_url(self) -> str:
+        if self.feed is not None:
+            return self.feed.url
+        return self.source or ""
+
+
+class FeedState(Base):
+    __tablename__ = "feed_state"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    modified = Column(String, nullable=True)  # raw Last-Modified header
+    checked_at = Column(DateTime, nullable=True)
+    watermark = Column(DateTime, nullable=True)  # newest published_at seen (UTC)
+    poll_interval = Column(Integer, nullable=True)  # seconds, adaptive schedule only
+    next_poll_at = Column(DateTime, nullable=True)  # UTC
+    failures = Column(Integer, nullable=True)  # consecutive failed fetches
+    last_error = Column(String, nullable=True)
+    disabled_until = Column(DateTime, nullable=True)  # UTC; skipped until then
+
+
+class Digest(Base):
+    """
+    One group's rendered digest for one cycle. Also the outbox: delivery
+    state lives on the row, so a retry resends the message as built.
+    """
+
+    __tablename__ = "digests"
+
+    id = Column(Integer, primary_key=True)
+    group_name = Column(String, nullable=False)
+    cycle = Column(String, nullable=False)  # digest day in SCHEDULE_TZ, e.g. "2024-05-01"
+    paper_ids = Column(Text, nullable=False)  # JSON list of fingerprints
+    recipients = Column(Text, nullable=False)  # JSON {"to": [...], "cc": [...], "bcc": [...]}
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)  # UTC; NULL until delivered
+    # Outbox state: "pending" until delivered ("sent") or given up on ("failed").
+    status = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)  # UTC; NULL = at once
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Also what stops two runs building the same group's digest for one cycle.
+        UniqueConstraint("group_name", "cycle", name="uq_digests_group_cycle"),
+        # Serves the delivery worker's scan for due messages.
+        Index("ix_digests_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
 
 def _ensure_sqlite_dir(database_url: str) -> None:
     if not database_url.startswith("sqlite:///"):
@@ -32,12 +143,188 @@ def _ensure_sqlite_dir(database_url: str) -> None:
         os.makedirs(directory, exist_ok=True)
 
 
-def create_session_factory(database_url: str):
+def _migrate(engine) -> None:
+    # create_all only creates missing tables; columns and indexes declared
+    # after a table already existed have to be added explicitly. New columns
+    # must be nullable. Safe to run on every start.
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        # Digests stored before the outbox columns existed: the delivered ones
+        # are done, the rest are still owed.
+        conn.execute(update(Digest).where(Digest.status.is_(None), Digest.sent_at.is_not(None)).values(status="sent"))
+        conn.execute(update(Digest).where(Digest.status.is_(None)).values(status="pending"))
+
+
+def _apply_sqlite_pragmas(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _sqlite_memory(url) -> bool:
+    # In-memory databases live in their one connection; SQLAlchemy pools them
+    # with SingletonThreadPool, which takes no pool_size/max_overflow.
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def create_session_factory(database_url: str, sqlite_tuning: bool = False):
+    """
+    Create the engine, bring the schema up to date and return a session factory.
+
+    With ``sqlite_tuning`` on a SQLite URL, every connection gets
+    ``SQLITE_PRAGMAS`` and, for a database file, the pool holds a single
+    connection, so all writes in this process go through one writer and never
+    compete for the database lock. Other processes can keep reading while it
+    writes. In-memory databases keep SQLAlchemy's default pool.
+    """
     _ensure_sqlite_dir(database_url)
-    engine = create_engine(database_url, future=True)
+    url = make_url(database_url)
+    if sqlite_tuning and url.get_backend_name() == "sqlite":
+        if _sqlite_memory(url):
+            engine = create_engine(url, future=True)
+        else:
+            engine = create_engine(url, future=True, pool_size=1, max_overflow=0)
+        _apply_sqlite_pragmas(engine)
+    else:
+        engine = create_engine(database_url, future=True)
     Base.metadata.create_all(engine)
+    _migrate(engine)
     return sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
 
 def get_paper(session, paper_id: str) -> Optional[Paper]:
     return session.get(Paper, paper_id)
+
+
+def existing_paper_ids(session, paper_ids: Iterable[str], chunk_size: int = 500) -> Set[str]:
+    """Return the subset of ``paper_ids`` already stored, one IN query per chunk."""
+    ids = list(paper_ids)
+    found: Set[str] = set()
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i : i + chunk_size]
+        found.update(session.execute(select(Paper.id).where(Paper.id.in_(chunk))).scalars())
+    return found
+
+
+def existing_canonical_keys(session, keys: Iterable[str], chunk_size: int = 500) -> Set[str]:
+    """Return the subset of ``keys`` some stored paper already has, one IN query per chunk."""
+    keys = [k for k in keys if k]
+    found: Set[str] = set()
+    for i in range(0, len(keys), chunk_size):
+        chunk = keys[i : i + chunk_size]
+        found.update(session.execute(select(Paper.canonical_key).where(Paper.canonical_key.in_(chunk))).scalars())
+    return found
+
+
+def _insert_ignoring_conflicts(session):
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(Paper)
+    return dialect_insert(Paper).on_conflict_do_nothing(index_elements=["id"])
+
+
+def bulk_insert_papers(session, rows: List[dict]) -> None:
+    """Insert paper rows in one executemany, skipping ids that already exist."""
+    if rows:
+        session.execute(_insert_ignoring_conflicts(session), rows)
+
+
+def load_feed_states(session) -> Dict[str, FeedState]:
+    return {state.url: state for state in session.query(FeedState).all()}
+
+
+def get_or_create_feed_state(session, states: Dict[str, FeedState], url: str) -> FeedState:
+    state = states.get(url)
+    if state is None:
+        state = FeedState(url=url)
+        session.add(state)
+        states[url] = state
+    return state
+
+
+def sync_sources(session, groups: Dict[str, List[str]]) -> Dict[str, int]:
+    """
+    Mirror rss_groups.json into the groups and feeds tables; returns feed ids by URL.
+
+    A URL listed under several groups belongs to the first one. Feeds dropped
+    from the file keep their row without a group, and groups no longer listed
+    are removed. Papers stored before these tables existed get their feed_id
+    from ``source`` here, once.
+    """
+    group_rows = {g.name: g for g in session.query(Group).all()}
+    for name in groups:
+        if name not in group_rows:
+            group_rows[name] = Group(name=name)
+            session.add(group_rows[name])
+    session.flush()
+
+    wanted: Dict[str, int] = {}
+    for name, urls in groups.items():
+        for url in urls:
+            wanted.setdefault(url, group_rows[name].id)
+    feeds = {f.url: f for f in session.query(Feed).all()}
+    legacy = session.execute(
+        select(Paper.source).where(Paper.feed_id.is_(None), Paper.source.is_not(None), Paper.source != "").distinct()
+    ).scalars()
+    for url in [*wanted, *legacy]:
+        if url not in feeds:
+            feeds[url] = Feed(url=url)
+            session.add(feeds[url])
+    for url, feed in feeds.items():
+        feed.group_id = wanted.get(url)
+    session.flush()
+
+    for name, group in group_rows.items():
+        if name not in groups:
+            session.delete(group)
+    session.execute(
+        update(Paper)
+        .where(Paper.feed_id.is_(None), Paper.source.is_not(None), Paper.source != "")
+        .values(feed_id=select(Feed.id).where(Feed.url == Paper.source).scalar_subquery(), source=None)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return {url: feed.id for url, feed in feeds.items()}
+
+
+def load_feed_ids(session) -> Dict[str, int]:
+    return {url: feed_id for url, feed_id in session.execute(select(Feed.url, Feed.id))}
+
+
+def get_digest(session, group_name: str, cycle: str) -> Optional[Digest]:
+    stmt = select(Digest).where(Digest.group_name == group_name, Digest.cycle == cycle)
+    return session.execute(stmt).scalar_one_or_none()
+
+
+def due_digests(session, now: datetime) -> List[Digest]:
+    """Pending digests whose next attempt is due at ``now`` (UTC), oldest first."""
+    stmt = (
+        select(Digest)
+        .where(Digest.status == "pending")
+        .where(or_(Digest.next_attempt_at.is_(None), Digest.next_attempt_at <= now))
+        .order_by(Digest.id)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def prune_digests(session, before: datetime) -> int:
+    """Delete delivered or abandoned digests created before ``before``; returns how many went."""
+    stmt = delete(Digest).where(Digest.created_at < before, Digest.status.is_distinct_from("pending"))
+    result = session.execute(stmt)
+    return result.rowcount or 0
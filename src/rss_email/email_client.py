@@ -1,15 +1,112 @@
 import smtplib
+import time
+from contextlib import contextmanager
 from email.message import EmailMessage
-from typing import List
+from typing import Dict, Iterator, List
 
 
 class EmailClient:
-    def __init__(self, host: str, port: int, username: str, password: str, sender: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        sender: str,
+        max_messages_per_connection: int = 0,
+        starttls: bool = True,
+    ) -> None:
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.sender = sender
+        # 0 means no cap; some providers drop a connection after N messages.
+        self.max_messages_per_connection = max_messages_per_connection
+        self.starttls = starttls
+        self._smtp: smtplib.SMTP | None = None
+        self._sent_on_connection = 0
+        self._session_depth = 0
+        # Seconds spent in connect / login / send during the last send() call.
+        self.last_timings: Dict[str, float] = {}
+
+    def clone(self) -> "EmailClient":
+        """Return a client with the same settings and its own connection."""
+        return EmailClient(
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            self.sender,
+            max_messages_per_connection=self.max_messages_per_connection,
+            starttls=self.starttls,
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        print(f"Connecting to {self.host}:{self.port}...")
+        started = time.perf_counter()
+
+        if self.port == 465:
+            # Port 465 uses SMTP_SSL
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
+        else:
+            # Port 587 uses STARTTLS; plain relays (e.g. port 25) can opt out
+            smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+            if self.starttls:
+                smtp.starttls()
+
+        smtp.set_debuglevel(2)
+        self.last_timings["connect"] = self.last_timings.get("connect", 0.0) + time.perf_counter() - started
+
+        if self.username:
+            print(f"Logging in as {self.username}...")
+            started = time.perf_counter()
+            smtp.login(self.username, self.password)
+            self.last_timings["login"] = self.last_timings.get("login", 0.0) + time.perf_counter() - started
+        return smtp
+
+    def _close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        self._sent_on_connection = 0
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _connection(self) -> smtplib.SMTP:
+        cap = self.max_messages_per_connection
+        if self._smtp is not None and cap and self._sent_on_connection >= cap:
+            self._close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    @contextmanager
+    def session(self) -> Iterator["EmailClient"]:
+        """
+        Keep one SMTP connection open for every send() inside the block.
+
+        The connection is opened lazily, replaced after
+        ``max_messages_per_connection`` messages or a dropped connection, and
+        closed when the outermost block exits.
+        """
+        self._session_depth += 1
+        try:
+            yield self
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self._close()
+
+    def _deliver(self, message: EmailMessage, all_rcpt: List[str]) -> None:
+        smtp = self._connection()
+        print("Sending message...")
+        started = time.perf_counter()
+        smtp.send_message(message, to_addrs=all_rcpt)
+        self.last_timings["send"] = time.perf_counter() - started
+        self._sent_on_connection += 1
 
     def send(
         self,
@@ -40,26 +137,22 @@ class EmailClient:
         all_rcpt.extend(cc)
         all_rcpt.extend(bcc)
 
+        self.last_timings = {}
         try:
-            print(f"Connecting to {self.host}:{self.port}...")
-
-            if self.port == 465:
-                # Port 465 uses SMTP_SSL
-                smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
-            else:
-                # Port 587 uses STARTTLS
-                smtp = smtplib.SMTP(self.host, self.port, timeout=30)
-                smtp.starttls()
-
-            smtp.set_debuglevel(2)
-
-            print(f"Logging in as {self.username}...")
-            smtp.login(self.username, self.password)
-
-            print("Sending message...")
-            smtp.send_message(message, to_addrs=all_rcpt)
-            smtp.quit()
+            try:
+                self._deliver(message, all_rcpt)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                if self._session_depth == 0 or self._sent_on_connection == 0:
+                    raise
+                # A reused connection went stale; retry once on a fresh one.
+                print("SMTP connection dropped; reconnecting...")
+                self._close()
+                self._deliver(message, all_rcpt)
             print("Message sent successfully!")
         except Exception as e:
             print(f"SMTP Error: {type(e).__name__}: {e}")
+            self._close()
             raise
+        finally:
+            if self._session_depth == 0:
+                self._close()
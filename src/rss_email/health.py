@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .db import FeedState
+
+FAILURE_THRESHOLD = 3
+BACKOFF_MINUTES = 60
+BACKOFF_MAX_HOURS = 168
+
+
+class FeedBreaker:
+    """
+    Per-feed circuit breaker kept in feed_state.
+
+    After ``threshold`` consecutive failures a feed is skipped until
+    ``disabled_until``. The backoff starts at ``backoff_minutes`` and doubles
+    with every further failure, up to ``max_backoff_hours``. Once it expires
+    the next cycle fetches the feed once as a probe. Success closes the
+    circuit; failure opens it again for twice as long.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FAILURE_THRESHOLD,
+        backoff_minutes: int = BACKOFF_MINUTES,
+        max_backoff_hours: int = BACKOFF_MAX_HOURS,
+    ) -> None:
+        self.threshold = max(1, threshold)
+        self.backoff = timedelta(minutes=backoff_minutes)
+        self.max_backoff = timedelta(hours=max_backoff_hours)
+
+    def is_open(self, state: FeedState | None, now: datetime) -> bool:
+        return state is not None and state.disabled_until is not None and state.disabled_until > now
+
+    def record_failure(self, state: FeedState, error: object, now: datetime) -> None:
+        state.failures = (state.failures or 0) + 1
+        state.last_error = str(error)[:500]
+        if state.failures < self.threshold:
+            return
+        backoff = min(self.backoff * 2 ** (state.failures - self.threshold), self.max_backoff)
+        state.disabled_until = now + backoff
+        print(
+            f"[WARNING] Feed {state.url} disabled until {state.disabled_until:%Y-%m-%d %H:%M} UTC "
+            f"after {state.failures} consecutive failures"
+        )
+
+    def record_success(self, state: FeedState) -> None:
+        if state.disabled_until is not None:
+            print(f"[INFO] Feed {state.url} recovered after {state.failures} failures")
+        state.failures = 0
+        state.last_error = None
+        state.disabled_until = None
+
+
+def disabled_feeds(session: Session, now: datetime | None = None) -> List[FeedState]:
+    """Feeds whose circuit is open right now, longest-failing first."""
+    now = now or datetime.utcnow()
+    stmt = select(FeedState).where(FeedState.disabled_until > now).order_by(FeedState.failures.desc())
+    return list(session.execute(stmt).scalars())
+
+
+def disabled_report(session: Session, now: datetime | None = None) -> List[str]:
+    """One line per disabled feed, for the end-of-run log."""
+    return [
+        f"{state.url}: {state.failures} failures, next try after "
+        f"{state.disabled_until:%Y-%m-%d %H:%M} UTC ({state.last_error})"
+        for state in disabled_feeds(session, now)
+    ]
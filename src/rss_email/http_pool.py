@@ -0,0 +1,189 @@
+import http.client
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import brotli  # optional: pip install "brotli>=1.2"
+
+    # Releases before 1.2 cannot cap the decompressed size, so a tiny
+    # response could expand without bound; those are not used.
+    if not hasattr(brotli.Decompressor, "can_accept_more_data"):
+        brotli = None
+except ImportError:
+    brotli = None
+
+# What a compressed download may come back as; decoded in rss_client.
+ACCEPT_ENCODING = "br, gzip" if brotli is not None else "gzip"
+MAX_REDIRECTS = 5
+# Servers drop idle keep-alive connections; older ones are not worth a retry.
+IDLE_SECONDS = 60.0
+_REDIRECTS = {301, 302, 303, 307, 308}
+
+_Key = Tuple[str, str, int]
+
+
+class PooledResponse:
+    """
+    The subset of ``http.client.HTTPResponse`` the feed readers use.
+
+    Closing it hands the connection back to the pool when the body was read
+    to the end and the server allows keep-alive; otherwise the connection is
+    closed.
+    """
+
+    def __init__(self, pool: "ConnectionPool", key: _Key, conn: http.client.HTTPConnection, response, url: str):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, size: int = -1) -> bytes:
+        # HTTPResponse takes None, not -1, for "up to the end of the body".
+        return self._response.read(size if size >= 0 else None)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._response.read1(size)
+
+    def geturl(self) -> str:
+        return self.url
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        # read1() can consume the whole body without marking the response
+        # closed, so a zero remaining length also counts as fully read.
+        finished = self._response.isclosed() or self._response.length == 0
+        if finished and not self._response.will_close:
+            self._response.close()
+            self._pool._release(self._key, conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared across fetches, pooled per host.
+
+    Feeds on the same host reuse one TCP/TLS connection instead of paying DNS,
+    connect and handshake each time. Thread-safe; each connection serves one
+    request at a time. ``opened`` and ``reused`` count connection setups and
+    reuses.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[_Key, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+        self.opened = 0
+        self.reused = 0
+
+    def _acquire(self, key: _Key, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, released = idle.pop()
+                if now - released <= IDLE_SECONDS:
+                    self.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._new_connection(key, timeout), False
+
+    def _new_connection(self, key: _Key, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            self.opened += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _release(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _request(self, url: str, headers: Dict[str, str], connect_timeout: float):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unsupported URL scheme: {url}")
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        conn, reused = self._acquire(key, connect_timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            return key, conn, conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        # The server closed an idle connection; retry once on a new one.
+        conn = self._new_connection(key, connect_timeout)
+        conn.request("GET", path, headers=headers)
+        return key, conn, conn.getresponse()
+
+    def open(self, url: str, headers: Dict[str, str], timeout: Tuple[float, float]) -> PooledResponse:
+        """
+        GET ``url``, following redirects. Raises ``urllib.error.HTTPError`` for
+        4xx/5xx, like ``urlopen``; a 304 is returned as a response.
+        """
+        connect_timeout, read_timeout = timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, response = self._request(url, headers, connect_timeout)
+            if conn.sock is not None:
+                conn.sock.settimeout(read_timeout)
+            pooled = PooledResponse(self, key, conn, response, url)
+            location = response.getheader("Location")
+            if response.status in _REDIRECTS and location:
+                response.read()
+                pooled.close()
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                response.read()
+                pooled.close()
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            return pooled
+        raise urllib.error.URLError(f"too many redirects: {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+
+def uses_proxy(url: str) -> bool:
+    """True when urllib would send ``url`` through a proxy; the pool connects directly."""
+    parts = urlsplit(url)
+    proxies = urllib.request.getproxies()
+    return parts.scheme.lower() in proxies and not urllib.request.proxy_bypass(parts.hostname or "")
+
+
+shared_pool = ConnectionPool()
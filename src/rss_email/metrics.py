@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+PROMETHEUS_PREFIX = "rss_email_"
+# Emitted once per occurrence (value 1) rather than measured each cycle; the
+# Prometheus sink keeps running totals of these.
+COUNTERS = frozenset({"feed_errors", "send_failures"})
+
+
+class MetricsSink:
+    """Receives per-cycle measurements. The base class discards everything."""
+
+    def emit(self, name: str, value: float, **labels: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.emit(name, time.perf_counter() - started, **labels)
+
+
+class JsonLinesSink(MetricsSink):
+    """Appends one JSON object per measurement to ``path`` on flush."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer: List[dict] = []
+
+    def emit(self, name: str, value: float, **labels: str) -> None:
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "metric": name, "value": value}
+        record.update(labels)
+        with self._lock:
+            self._buffer.append(record)
+
+    def flush(self) -> None:
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+        _ensure_parent(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PrometheusTextSink(MetricsSink):
+    """
+    Writes the latest value of every series in the Prometheus text format.
+
+    Metrics in COUNTERS are summed instead and exported as ``<name>_total``
+    counters, so an error stays visible as an increase rather than as a
+    value that never goes back down. The file is replaced atomically on flush, so it can be scraped through the
+    node_exporter textfile collector.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+
+    def emit(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._series.setdefault(name, {})
+            series[key] = series.get(key, 0) + value if name in COUNTERS else value
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._series):
+                if name in COUNTERS:
+                    metric = f"{PROMETHEUS_PREFIX}{name}_total"
+                    lines.append(f"# TYPE {metric} counter")
+                else:
+                    metric = PROMETHEUS_PREFIX + name
+                    lines.append(f"# TYPE {metric} gauge")
+                for key, value in self._series[name].items():
+                    labels = ",".join(f'{k}="{_escape_label(v)}"' for k, v in key)
+                    lines.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        _ensure_parent(self.path)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, self.path)
+
+
+def _ensure_parent(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+
+class MultiSink(MetricsSink):
+    def __init__(self, sinks: List[MetricsSink]) -> None:
+        self.sinks = sinks
+
+    def emit(self, name: str, value: float, **labels: str) -> None:
+        for sink in self.sinks:
+            sink.emit(name, value, **labels)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+
+NULL_SINK = MetricsSink()
+
+
+def create_sink(spec: str) -> MetricsSink:
+    """
+    Build a sink from a ``kind:path`` spec, e.g. ``jsonl:data/metrics.jsonl`` or
+    ``prometheus:data/rss_email.prom``. Several specs may be comma-separated.
+    An empty spec disables metrics.
+    """
+    specs = [part.strip() for part in spec.split(",") if part.strip()]
+    if not specs:
+        return NULL_SINK
+    if len(specs) > 1:
+        return MultiSink([_create_one(part) for part in specs])
+    return _create_one(specs[0])
+
+
+def _create_one(spec: str) -> MetricsSink:
+    kind, _, path = spec.partition(":")
+    kind = kind.strip().lower()
+    if not path:
+        raise ValueError(f"Metrics sink needs a path: {spec!r}")
+    if kind == "jsonl":
+        return JsonLinesSink(path)
+    if kind == "prometheus":
+        return PrometheusTextSink(path)
+    raise ValueError(f"Unknown metrics sink {kind!r}; expected 'jsonl' or 'prometheus'")
@@ -0,0 +1,203 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+
+from sqlalchemy.orm import Session
+
+from .config import Settings
+from .db import load_feed_states
+from .email_client import EmailClient
+from .metrics import NULL_SINK, MetricsSink
+from .rss_client import BudgetExceeded, _host_of
+from .workflow import (
+    _Digest,
+    _IngestRun,
+    _cycle_deadline,
+    _digest_cycle,
+    _due_digests,
+    _feeds_to_fetch,
+    _feed_ids,
+    _group_sources,
+    _ingest_result,
+    _make_breaker,
+    _make_fetcher,
+    _prepare_digest,
+    _prune_digests,
+    _record_delivery,
+    _send_digest,
+    deliver_outbox,
+)
+
+_DONE = object()
+
+
+async def run_cycle_async(
+    settings: Settings,
+    session: Session,
+    email_client: EmailClient,
+    metrics: MetricsSink = NULL_SINK,
+    cycle: str | None = None,
+) -> dict:
+    """
+    Fetch, store and send as overlapping stages joined by bounded queues.
+
+    Same result as the sequential cycle: feeds are fetched concurrently, each
+    result is stored as soon as it arrives, and a group's digest is sent as
+    soon as every feed mapped to that group has been stored, while other
+    feeds are still downloading. Papers from feeds no longer in any group go
+    out last under "Default". Digests are queued in the outbox per group and
+    ``cycle`` as in send_unsent; earlier digests due for a retry are sent
+    once every group is done.
+
+    Blocking work (HTTP, SQLAlchemy, SMTP) runs off the event loop. All
+    database access goes through one dedicated thread, so the session is
+    never used concurrently.
+    """
+    loop = asyncio.get_running_loop()
+    db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rss-db")
+
+    def on_db(fn, *args):
+        return loop.run_in_executor(db_thread, functools.partial(fn, *args))
+
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_queue_size))
+    ready: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_queue_size))
+    totals = {"ingested": 0, "sent": 0}
+    failed: List[str] = []
+    sent_groups: List[str] = []
+    attempted: Set[int] = set()
+
+    cycle = cycle or _digest_cycle(settings)
+    await on_db(_prune_digests, settings, session)
+    feed_ids = await on_db(_feed_ids, settings, session)
+    states = await on_db(load_feed_states, session)
+    deadline = _cycle_deadline(settings)
+    breaker = _make_breaker(settings)
+    to_fetch = _feeds_to_fetch(settings.rss_urls, states, breaker, metrics)
+    fetch, parser = _make_fetcher(settings, states)
+
+    sources = _group_sources(settings)
+    # "Default" also collects papers from feeds no longer in any group, so it
+    # is always planned last, once every feed has been stored. Disabled feeds
+    # are not waited for.
+    pending: Dict[str, Set[str]] = {
+        g: set(group_urls).intersection(to_fetch) for g, group_urls in sources.items() if g != "Default"
+    }
+
+    global_slots = asyncio.Semaphore(max(1, settings.fetch_workers))
+    host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def fetch_one(url: str) -> None:
+        host = host_slots.setdefault(_host_of(url), asyncio.Semaphore(max(1, settings.fetch_per_host)))
+        # Take the host slot first so feeds queued behind a busy host do not
+        # hold one of the global slots.
+        async with host, global_slots:
+            if deadline is not None and time.monotonic() >= deadline:
+                item = (url, None, BudgetExceeded("cycle time budget exhausted"))
+            else:
+                try:
+                    item = (url, await asyncio.to_thread(fetch, url), None)
+                except Exception as e:
+                    item = (url, None, e)
+        # Blocks while the writer is behind, without holding a fetch slot.
+        await fetched.put(item)
+
+    async def fetch_stage() -> None:
+        with metrics.timer("stage_seconds", stage="fetch"):
+            await asyncio.gather(*(fetch_one(url) for url in to_fetch))
+        # Not in a finally: once the cycle is cancelled nothing reads the
+        # queue any more, and a put on a full queue would never return.
+        await fetched.put(_DONE)
+
+    run = _IngestRun(session, settings.ingest_commit_rows, metrics, breaker)
+
+    async def persist_stage() -> None:
+        with metrics.timer("stage_seconds", stage="persist"):
+            # Groups with no feeds of their own can go straight away.
+            for group, urls in pending.items():
+                if not urls:
+                    await ready.put(group)
+            while True:
+                item = await fetched.get()
+                if item is _DONE:
+                    break
+                url, result, error = item
+                created = await on_db(_ingest_result, run, states, feed_ids, url, result, error)
+                totals["ingested"] += created
+                for group, urls in pending.items():
+                    if url in urls:
+                        urls.discard(url)
+                        if not urls:
+                            await ready.put(group)
+            await on_db(run.commit)
+            run.report_skipped()
+        await ready.put("Default")
+        await ready.put(_DONE)
+
+    def plan(group: str) -> _Digest | None:
+        return _prepare_digest(settings, session, group, cycle, metrics)
+
+    async def send_worker(client: EmailClient) -> None:
+        with client.session():
+            while True:
+                group = await ready.get()
+                if group is _DONE:
+                    # Let the other workers see the end marker too.
+                    await ready.put(_DONE)
+                    return
+                digest = await on_db(plan, group)
+                if digest is None:
+                    continue
+                error = None
+                try:
+                    await asyncio.to_thread(_send_digest, client, digest)
+                except Exception as e:
+                    error = e
+                    failed.append(digest.group)
+                sent_groups.append(digest.group)
+                # Await first: "totals[...] += await ..." would read the total
+                # before yielding and lose another worker's update.
+                sent = await on_db(record, digest, error)
+                totals["sent"] += sent
+
+    def record(digest: _Digest, error: Exception | None) -> int:
+        # On the database thread: reading the row id may reload it.
+        attempted.add(digest.stored.id)
+        return _record_delivery(settings, session, digest, error, metrics)
+
+    def deliver_backlog() -> dict:
+        # Digests queued by earlier runs whose retry is due; the ones just
+        # attempted wait for their own backoff.
+        return deliver_outbox(settings, session, email_client, metrics, _due_digests(session, attempted))
+
+    workers = max(1, settings.send_workers)
+    clients = [email_client] if workers == 1 else [email_client.clone() for _ in range(workers)]
+    tasks = [
+        asyncio.ensure_future(fetch_stage()),
+        asyncio.ensure_future(persist_stage()),
+        *(asyncio.ensure_future(send_worker(c)) for c in clients),
+    ]
+    try:
+        with parser:
+            await asyncio.gather(*tasks)
+        backlog = await on_db(deliver_backlog)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        db_thread.shutdown(wait=True)
+
+    totals["sent"] += backlog["sent"]
+    failed.extend(backlog["failed"])
+    metrics.emit("cycle_ingested", totals["ingested"])
+    metrics.emit("cycle_sent", totals["sent"])
+    return {
+        "ingested": totals["ingested"],
+        "sent": totals["sent"],
+        "groups": len(sent_groups) + backlog["groups"],
+        "failed": failed,
+        "skipped": run.skipped,
+    }
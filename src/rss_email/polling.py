@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import Settings
+from .db import FeedState, Paper, get_or_create_feed_state, load_feed_ids, load_feed_states
+from .metrics import NULL_SINK, MetricsSink
+from .workflow import ingest_feeds
+
+# Publish times per feed used to estimate its cadence.
+HISTORY_SIZE = 20
+
+
+def estimate_interval(published: List[datetime], now: datetime, min_seconds: float, max_seconds: float) -> float:
+    """
+    Seconds until a feed should be polled again, from its recent publish times (newest first).
+
+    Polls about twice per typical gap between entries. A feed that has been
+    quiet for longer than usual is polled less and less often, and one with no
+    dated history keeps the slowest rate.
+    """
+    if not published:
+        return max_seconds
+    # Entries published in one batch share a timestamp; only real gaps count.
+    gaps = sorted((a - b).total_seconds() for a, b in zip(published, published[1:]) if a > b)
+    typical = gaps[len(gaps) // 2] if gaps else max_seconds
+    quiet = (now - published[0]).total_seconds()
+    return min(max_seconds, max(min_seconds, max(typical, quiet) / 2))
+
+
+def _recent_publish_times(session: Session, feed_id: int | None) -> List[datetime]:
+    if feed_id is None:
+        return []
+    stmt = (
+        select(Paper.published_at)
+        .where(Paper.feed_id == feed_id, Paper.published_at.is_not(None))
+        .order_by(Paper.published_at.desc())
+        .limit(HISTORY_SIZE)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def _is_due(state: FeedState | None, now: datetime) -> bool:
+    return state is None or state.next_poll_at is None or state.next_poll_at <= now
+
+
+def due_feeds(settings: Settings, session: Session, now: datetime | None = None) -> List[str]:
+    """Configured feeds whose next poll time has passed; never-polled feeds are due at once."""
+    now = now or datetime.utcnow()
+    states = load_feed_states(session)
+    return [url for url in settings.rss_urls if _is_due(states.get(url), now)]
+
+
+def poll_due_feeds(settings: Settings, session: Session, metrics: MetricsSink = NULL_SINK) -> int:
+    """
+    Fetch only the feeds that are due, then give each one fetched its next
+    poll time. Feeds the cycle budget left unfetched stay due.
+
+    Returns the number of new papers stored. Sending is left to the digest job.
+    """
+    now = datetime.utcnow()
+    due = due_feeds(settings, session, now)
+    metrics.emit("feeds_due", len(due))
+    if not due:
+        return 0
+    skipped: List[str] = []
+    created = ingest_feeds(settings, session, metrics, urls=due, skipped=skipped)
+
+    states = load_feed_states(session)
+    feed_ids = load_feed_ids(session)
+    min_seconds = settings.poll_min_minutes * 60
+    max_seconds = max(min_seconds, settings.poll_max_minutes * 60)
+    not_fetched = set(skipped)
+    for url in due:
+        if url in not_fetched:
+            continue
+        interval = estimate_interval(_recent_publish_times(session, feed_ids.get(url)), now, min_seconds, max_seconds)
+        # Jitter keeps feeds with the same cadence from being polled in one burst.
+        interval *= random.uniform(1 - settings.poll_jitter, 1 + settings.poll_jitter)
+        state = get_or_create_feed_state(session, states, url)
+        state.poll_interval = int(interval)
+        state.next_poll_at = now + timedelta(seconds=interval)
+        metrics.emit("feed_poll_interval_seconds", int(interval), feed=url)
+    session.commit()
+    return created
@@ -0,0 +1,148 @@
+import html
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from string import Template
+from typing import Iterable, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_SUMMARY_CHARS = 600
+FRAGMENT_CACHE_SIZE = 4096
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_SAFE_SCHEMES = {"http", "https", "mailto"}
+
+# Templates are parsed once at import; substitute() only fills in values.
+_DIGEST_HTML = Template(
+    """
+    <html>
+        <body>
+            <p>Latest papers for group: $group</p>
+            <ul>
+                $items
+            </ul>
+            <p>Generated at $ts</p>
+        </body>
+    </html>
+    """
+)
+_ITEM_HTML = Template(
+    "<li><a href='$link'>$title</a>"
+    "<br/><small>$authors | $published | $source</small>"
+    "<p>$summary</p></li>"
+)
+_ITEM_TEXT = Template("$title\n$authors | $published | $source\n$link\n")
+_NO_NEW_HTML = Template(
+    """
+    <html>
+      <body>
+        <p>No new papers for group: $group</p>
+        <p>Generated at $ts</p>
+      </body>
+    </html>
+    """
+)
+
+
+def _format_date(dt: datetime | None) -> str:
+    if not dt:
+        return ""
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
+
+
+def plain_summary(summary: str, limit: int = DEFAULT_SUMMARY_CHARS) -> str:
+    """Strip markup from a feed summary and cut it to ``limit`` characters (0 = no limit)."""
+    text = _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", summary or ""))).strip()
+    if limit and len(text) > limit:
+        text = text[:limit].rsplit(" ", 1)[0].rstrip(" ,.;:") + "…"
+    return text
+
+
+def _safe_link(link: str) -> str:
+    link = (link or "").strip()
+    if urlparse(link).scheme.lower() not in _SAFE_SCHEMES:
+        return "#"
+    return link
+
+
+class FragmentCache:
+    """LRU of rendered (html, text) fragments keyed by paper fingerprint and summary budget."""
+
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, int], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Tuple[str, str] | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, int], value: Tuple[str, str]) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def render_paper(paper, summary_limit: int = DEFAULT_SUMMARY_CHARS) -> Tuple[str, str]:
+    """Return the (html, text) fragment for one paper, rendering it at most once."""
+    key = (paper.id, summary_limit)
+    cached = fragment_cache.get(key)
+    if cached is not None:
+        return cached
+
+    published = _format_date(paper.published_at)
+    source = paper.source_url
+    fragment_html = _ITEM_HTML.substitute(
+        link=html.escape(_safe_link(paper.link), quote=True),
+        title=html.escape(paper.title or ""),
+        authors=html.escape(paper.authors or ""),
+        published=published,
+        source=html.escape(source),
+        summary=html.escape(plain_summary(paper.summary, summary_limit)),
+    )
+    fragment_text = _ITEM_TEXT.substitute(
+        title=paper.title or "",
+        authors=paper.authors or "Unknown authors",
+        published=published,
+        source=source,
+        link=paper.link or "",
+    )
+    fragment_cache.put(key, (fragment_html, fragment_text))
+    return fragment_html, fragment_text
+
+
+def render_digest_html(papers: Iterable, group_name: str, summary_limit: int = DEFAULT_SUMMARY_CHARS) -> str:
+    items = "\n".join(render_paper(p, summary_limit)[0] for p in papers)
+    return _DIGEST_HTML.substitute(group=html.escape(group_name), items=items, ts=_now())
+
+
+def render_digest_text(papers: Iterable, group_name: str, summary_limit: int = DEFAULT_SUMMARY_CHARS) -> str:
+    lines = [f"Group: {group_name}\n"]
+    lines.extend(render_paper(p, summary_limit)[1] for p in papers)
+    return "\n".join(lines)
+
+
+def render_no_new_html(group_name: str) -> str:
+    return _NO_NEW_HTML.substitute(group=html.escape(group_name), ts=_now())
+
+
+def render_no_new_text(group_name: str) -> str:
+    return f"No new papers for group: {group_name}\nGenerated at {_now()}"
@@ -1,9 +1,54 @@
 import hashlib
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List
+import io
+import multiprocessing
+import re
+import time
+import unicodedata
+import zlib
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import astuple, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlparse, urlsplit
 
 import feedparser
+
+from .http_pool import ACCEPT_ENCODING, ConnectionPool, brotli, uses_proxy
+from .snapshots import SnapshotStore
+
+USER_AGENT = 'RSS Email Bot/1.0'
+# With a watermark, stop reading a feed after this many consecutive entries
+# older than it, if its dates so far run newest first (see _StaleCutoff).
+STALE_RUN_LIMIT = 5
+# (connect, read) seconds; connect covers everything up to the response headers,
+# read the whole body.
+DEFAULT_TIMEOUT = (10.0, 30.0)
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+_READ_CHUNK = 64 * 1024
+
+Timeout = Union[float, Tuple[float, float]]
+
+_DOI_RE = re.compile(r"\b(10\.\d{4,9}/[^\s\"'<>]+)", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+# Query parameters that only track the click and never identify the article.
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "cmp", "ref", "rss", "src"}
+
+
+class FeedTooLarge(ValueError):
+    pass
+
+
+class BudgetExceeded(Exception):
+    """The cycle's time budget ran out before this feed was fetched."""
+
+
 @dataclass
 class PaperInput:
     fingerprint: str
@@ -13,6 +58,40 @@ class PaperInput:
     link: str
     published_at: datetime | None
     source: str
+    # Same paper from any feed or re-dated entry -> same key; see _canonical_key.
+    canonical_key: str = ""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    # A list, or a lazy iterator when the feed is streamed (see stream_feed).
+    entries: Iterable[PaperInput]
+    etag: str | None = None
+    modified: str | None = None
+    not_modified: bool = False
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    bytes: int = 0
+    # Set when the download or parse failed; entries are then empty.
+    error: str | None = None
+
+
+@dataclass
+class RawFeed:
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str]  # lower-cased names
+    size: int = 0  # bytes on the wire, before decompression
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("etag")
+
+    @property
+    def modified(self) -> str | None:
+        return self.headers.get("last-modified")
 
 
 def _to_datetime(parsed_time) -> datetime | None:
@@ -31,29 +110,266 @@ def _fingerprint(entry_id: str, link: str, published: datetime | None) -> str:
     return hashlib.md5(raw.encode("utf-8")).hexdigest()
 
 
-def fetch_feed(url: str, timeout: int = 30) -> List[PaperInput]:
+def _doi_fields(candidate: str) -> List[str]:
+    parts = urlsplit(candidate)
+    if parts.scheme.lower() in ("http", "https"):
+        # Search the path and each query value on their own, so a DOI taken
+        # from a link never runs on into its query string or fragment.
+        return [unquote(parts.path), *(value for _, value in parse_qsl(parts.query))]
+    return [unquote(candidate)]
+
+
+def _extract_doi(*candidates: str) -> str:
+    for candidate in candidates:
+        for field in _doi_fields((candidate or "").strip()):
+            match = _DOI_RE.search(field)
+            if match:
+                return match.group(1).rstrip(".,;)]").lower()
+    return ""
+
+
+def _normalize_link(link: str) -> str:
+    """Scheme-, www- and tracking-free form of an http(s) URL; "" for anything else."""
+    parts = urlsplit((link or "").strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return ""
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def _normalize_title(title: str) -> str:
+    text = unicodedata.normalize("NFKC", _TAG_RE.sub("", title or "")).casefold()
+    return _NON_WORD_RE.sub("", text)
+
+
+def _canonical_key(entry_id: str, link: str, title: str, doi: str = "") -> str:
+    """
+    Identity of the paper behind a feed entry, independent of feed and timestamp.
+
+    The first of these that is available wins: a DOI (from a DOI field, the
+    entry id or the link), the normalised link or URL-shaped id, then the
+    normalised title. Returns "" when none is usable.
+    """
+    found = _extract_doi(doi, entry_id, link)
+    if found:
+        key = f"doi:{found}"
+    else:
+        url = _normalize_link(link) or _normalize_link(entry_id)
+        title = _normalize_title(title)
+        if url:
+            key = f"url:{url}"
+        elif title and title != "notitle":
+            key = f"title:{title}"
+        else:
+            return ""
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def fetch_feed(url: str, timeout: Timeout = DEFAULT_TIMEOUT) -> List[PaperInput]:
     """
     Fetch and parse RSS feed with timeout control.
     
     Args:
         url: RSS feed URL
-        timeout: Request timeout in seconds (default: 30)
+        timeout: Request timeout in seconds, or a (connect, read) pair
     """
+    return fetch_feed_conditional(url, timeout=timeout).entries
+
+
+def _split_timeout(timeout: Timeout) -> Tuple[float, float]:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def _set_read_timeout(response, seconds: float) -> None:
+    # urlopen's timeout has covered connecting and the headers; from here on
+    # each socket read gets the read timeout instead.
+    sock = getattr(getattr(getattr(response, "fp", None), "raw", None), "_sock", None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+def _open(
+    url: str,
+    etag: str | None,
+    modified: str | None,
+    timeout: Timeout,
+    compressed: bool,
+    pool: ConnectionPool | None = None,
+):
+    """
+    Issue a conditional GET; returns the open response, or None on 304.
+
+    With a ``pool`` the request goes over a pooled keep-alive connection,
+    unless urllib would route it through a proxy.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if compressed:
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    connect_timeout, read_timeout = _split_timeout(timeout)
+    if pool is not None and not uses_proxy(url):
+        response = pool.open(url, headers, (connect_timeout, read_timeout))
+        if response.status == 304:
+            # Reading the empty body lets the connection go back to the pool.
+            response.read()
+            response.close()
+            return None
+        return response
+    request = urllib.request.Request(url, headers=headers)
     try:
-        feed = feedparser.parse(url, request_headers={'User-Agent': 'RSS Email Bot/1.0'})
-        if feed.get('bozo', False) and feed.get('bozo_exception'):
-            print(f"Warning: Feed parsing error for {url}: {feed.bozo_exception}")
-    except Exception as e:
-        print(f"Error fetching feed {url}: {e}")
-        return []
+        response = urllib.request.urlopen(request, timeout=connect_timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    _set_read_timeout(response, read_timeout)
+    return response
+
+
+def _check_size(size: int, max_bytes: int, url: str) -> None:
+    if max_bytes and size > max_bytes:
+        raise FeedTooLarge(f"Feed {url} is larger than {max_bytes} bytes")
+
+
+def _read_body(response, url: str, read_timeout: float, max_bytes: int) -> bytes:
+    """Read the whole body within ``read_timeout`` seconds and ``max_bytes`` bytes."""
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit():
+        _check_size(int(length), max_bytes, url)
+    deadline = time.monotonic() + read_timeout
+    chunks: List[bytes] = []
+    size = 0
+    while True:
+        # read1 returns after one socket read, so the deadline is checked often.
+        chunk = response.read1(_READ_CHUNK)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        _check_size(size, max_bytes, url)
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Reading feed {url} took longer than {read_timeout}s")
+
+
+def _decode(body: bytes, encoding: str, url: str, max_bytes: int) -> bytes:
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(wbits=31)
+        body = decompressor.decompress(body, max_bytes + 1 if max_bytes else 0)
+    elif encoding == "br" and brotli is not None:
+        decompressor = brotli.Decompressor()
+        if max_bytes:
+            body = decompressor.process(body, output_buffer_limit=max_bytes + 1)
+        else:
+            body = decompressor.process(body)
+    _check_size(len(body), max_bytes, url)
+    return body
+
+
+def download_feed(
+    url: str,
+    etag: str | None = None,
+    modified: str | None = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    pool: ConnectionPool | None = None,
+) -> RawFeed:
+    """
+    Conditional GET of a feed body, gzip or brotli encoded when the server
+    offers it, returned as decoded bytes for the parser.
+
+    Raises on connect or read timeouts, and with FeedTooLarge when the body,
+    compressed or not, is bigger than ``max_bytes`` (0 = no limit).
+    """
+    response = _open(url, etag, modified, timeout, compressed=True, pool=pool)
+    if response is None:
+        return RawFeed(url=url, status=304, body=b"", headers={})
+    with response:
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        body = _read_body(response, url, _split_timeout(timeout)[1], max_bytes)
+        final_url = response.geturl()
+    size = len(body)
+    body = _decode(body, headers.get("content-encoding", "").strip().lower(), url, max_bytes)
+    # feedparser resolves relative links against this, as it would when fetching itself.
+    headers.setdefault("content-location", final_url)
+    return RawFeed(url=url, status=response.status, body=body, headers=headers, size=size)
+
+
+class _StaleCutoff:
+    """
+    Counts consecutive entries published before ``since``; undated entries always pass.
+
+    Reading may only stop early once the feed has shown it lists entries
+    newest first: every dated entry so far no newer than the one before, at
+    least one strictly older. A feed in any other order is filtered entry by
+    entry and read to the end.
+    """
+
+    def __init__(self, since: datetime | None) -> None:
+        self.since = since
+        self.run = 0
+        self._previous: datetime | None = None
+        self._descending = True
+        self._decreased = False
+
+    def stale(self, published: datetime | None) -> bool:
+        if published is not None:
+            if self._previous is not None:
+                if published > self._previous:
+                    self._descending = False
+                elif published < self._previous:
+                    self._decreased = True
+            self._previous = published
+        if self.since is None or published is None or published >= self.since:
+            self.run = 0
+            return False
+        self.run += 1
+        return True
+
+    @property
+    def exhausted(self) -> bool:
+        return self.run >= STALE_RUN_LIMIT and self._descending and self._decreased
+
+
+def parse_feed_bytes(
+    body: bytes,
+    url: str,
+    headers: Dict[str, str] | None = None,
+    since: datetime | None = None,
+) -> List[PaperInput]:
+    """Parse a downloaded feed; entries published before ``since`` are skipped."""
+    feed = feedparser.parse(body, response_headers=headers or {"content-location": url})
+    if feed.get('bozo', False) and feed.get('bozo_exception'):
+        print(f"Warning: Feed parsing error for {url}: {feed.bozo_exception}")
+
+    cutoff = _StaleCutoff(since)
     results: List[PaperInput] = []
     for entry in feed.entries:
         published = _to_datetime(getattr(entry, "published_parsed", None))
+        if cutoff.stale(published):
+            if cutoff.exhausted:
+                break
+            continue
         entry_id = getattr(entry, "id", "") or getattr(entry, "guid", "")
         link = getattr(entry, "link", "")
         title = getattr(entry, "title", "(no title)")
         summary = getattr(entry, "summary", "")
         authors = ", ".join(a.get("name") for a in getattr(entry, "authors", []) if a.get("name"))
+        doi = entry.get("prism_doi", "") or entry.get("dc_identifier", "")
 
         fp = _fingerprint(entry_id, link, published)
         results.append(
@@ -65,6 +381,419 @@ def fetch_feed(url: str, timeout: int = 30) -> List[PaperInput]:
                 link=link,
                 published_at=published,
                 source=url,
+                canonical_key=_canonical_key(entry_id, link, title, doi),
             )
         )
     return results
+
+
+def _parse_compact(body: bytes, url: str, headers: Dict[str, str], since: datetime | None) -> List[tuple]:
+    # Runs in a worker process; plain tuples pickle smaller than dataclasses.
+    return [astuple(entry) for entry in parse_feed_bytes(body, url, headers, since=since)]
+
+
+def _process_context():
+    # Not fork: the pool is used from fetch threads, and a child forked while
+    # another thread holds a lock (stdout, logging) can deadlock on it.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class ParserPool:
+    """
+    Parse feed bodies (feedparser + fingerprinting) in a process pool.
+
+    ``workers <= 0`` parses in-process. Workers come from a forkserver (spawn
+    where that is unavailable), and one is started here, before any fetch
+    thread runs. If the pool cannot be started, cannot start further workers
+    or breaks, parsing falls back to in-process with a warning.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self._pool: ProcessPoolExecutor | None = None
+        if workers > 0:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=_process_context())
+                # Start a worker now, so a pool that cannot run fails here and not per feed.
+                self._pool.submit(int).result()
+            except (OSError, NotImplementedError, ImportError, BrokenProcessPool) as e:
+                print(f"Warning: Parser process pool unavailable, parsing in-process: {e}")
+                self._drop()
+
+    def _drop(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def parse(
+        self, body: bytes, url: str, headers: Dict[str, str], since: datetime | None = None
+    ) -> List[PaperInput]:
+        pool = self._pool
+        if pool is not None:
+            try:
+                rows = pool.submit(_parse_compact, body, url, headers, since).result()
+                return [PaperInput(*row) for row in rows]
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                # OSError: a worker could not be started (EAGAIN, EMFILE, ...);
+                # RuntimeError: another thread already shut the pool down.
+                print(f"Warning: Parser process pool failed, parsing in-process: {e}")
+                self._drop()
+        return parse_feed_bytes(body, url, headers, since=since)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ParserPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def fetch_feed_conditional(
+    url: str,
+    etag: str | None = None,
+    modified: str | None = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    since: datetime | None = None,
+    parse: Callable[..., List[PaperInput]] = parse_feed_bytes,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    pool: ConnectionPool | None = None,
+    snapshots: SnapshotStore | None = None,
+) -> FetchResult:
+    """
+    Fetch a feed, sending stored ETag / Last-Modified validators.
+
+    A 304 response comes back with ``not_modified=True`` and no entries; the
+    body is never parsed. The returned validators should be stored for the
+    next request. Entries published before ``since`` are left out. ``parse``
+    may be swapped for e.g. ``ParserPool.parse``. With ``snapshots`` every
+    downloaded body is also kept there for replay.
+    """
+    started = time.perf_counter()
+    try:
+        raw = download_feed(url, etag=etag, modified=modified, timeout=timeout, max_bytes=max_bytes, pool=pool)
+    except Exception as e:
+        print(f"Error fetching feed {url}: {e}")
+        return FetchResult(url=url, entries=[], etag=etag, modified=modified, error=f"{type(e).__name__}: {e}")
+    downloaded = time.perf_counter()
+
+    result = FetchResult(
+        url=url,
+        entries=[],
+        etag=raw.etag or etag,
+        modified=raw.modified or modified,
+        not_modified=raw.status == 304,
+        fetch_seconds=downloaded - started,
+        bytes=raw.size,
+    )
+    if result.not_modified:
+        return result
+    if snapshots is not None:
+        _save_snapshot(snapshots, url, raw.body, raw.headers, raw.status)
+    try:
+        result.entries = parse(raw.body, url, raw.headers, since=since)
+    except Exception as e:
+        print(f"Error parsing feed {url}: {e}")
+        result.error = f"{type(e).__name__}: {e}"
+    result.parse_seconds = time.perf_counter() - downloaded
+    return result
+
+
+def _save_snapshot(snapshots: SnapshotStore, url: str, body: bytes, headers: Dict[str, str], status: int) -> None:
+    # A full disk or unwritable store must not cost us the feed itself.
+    try:
+        snapshots.save(url, body, headers, status)
+    except OSError as e:
+        print(f"[WARNING] Could not store snapshot of {url}: {e}")
+
+
+def replay_feed(
+    url: str,
+    snapshots: SnapshotStore,
+    at: datetime | None = None,
+    etag: str | None = None,
+    modified: str | None = None,
+    parse: Callable[..., List[PaperInput]] = parse_feed_bytes,
+) -> FetchResult:
+    """
+    Parse the newest stored snapshot of ``url`` taken at or before ``at``,
+    instead of downloading the feed.
+
+    The given validators are passed through unchanged, so replaying does not
+    disturb conditional requests to the real feed. A feed with no snapshot
+    comes back as not modified.
+    """
+    started = time.perf_counter()
+    result = FetchResult(url=url, entries=[], etag=etag, modified=modified)
+    try:
+        snapshot = snapshots.load(url, at)
+    except (OSError, ValueError) as e:
+        print(f"Error reading snapshot of {url}: {e}")
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    if snapshot is None:
+        print(f"[INFO] No snapshot of {url} to replay")
+        result.not_modified = True
+        return result
+    loaded = time.perf_counter()
+    result.fetch_seconds = loaded - started
+    result.bytes = len(snapshot.body)
+    try:
+        result.entries = parse(snapshot.body, url, snapshot.headers)
+    except Exception as e:
+        print(f"Error parsing feed {url}: {e}")
+        result.error = f"{type(e).__name__}: {e}"
+    result.parse_seconds = time.perf_counter() - loaded
+    return result
+
+
+class _CountingReader:
+    def __init__(
+        self, raw, url: str = "", max_bytes: int = 0, keep: bool = False, read_timeout: float = 0
+    ) -> None:
+        # read1 returns after one socket read, so the deadline is checked often.
+        self._read = getattr(raw, "read1", raw.read)
+        self.url = url
+        self.max_bytes = max_bytes
+        self.read_timeout = read_timeout
+        # Time spent inside read() only: the consumer parses and stores
+        # entries between reads, and that must not count against the feed.
+        self.read_seconds = 0.0
+        self.count = 0
+        # With ``keep`` the bytes read are also collected, e.g. for a snapshot.
+        self.chunks: List[bytes] | None = [] if keep else None
+        self.eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        started = time.monotonic()
+        data = self._read(size)
+        self.read_seconds += time.monotonic() - started
+        if not data and size != 0:
+            self.eof = True
+        self.count += len(data)
+        _check_size(self.count, self.max_bytes, self.url)
+        if self.read_timeout and self.read_seconds > self.read_timeout:
+            raise TimeoutError(f"Reading feed {self.url} took longer than {self.read_timeout}s")
+        if self.chunks is not None:
+            self.chunks.append(data)
+        return data
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem: ET.Element) -> str:
+    return "".join(elem.itertext()).strip()
+
+
+def _parse_date(value: str) -> datetime | None:
+    # Normalised to naive UTC, matching what feedparser's *_parsed gives us.
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _entry_from_element(item: ET.Element, url: str) -> PaperInput:
+    entry_id = item.get(_RDF_ABOUT, "")
+    link = title = summary = content = published = permalink = doi = ""
+    authors: List[str] = []
+    for child in item:
+        name = _local(child.tag)
+        if name == "title" and not title:
+            title = _text(child)
+        elif name == "link" and not link:
+            if child.tag == f"{_ATOM}link":
+                if child.get("rel", "alternate") == "alternate":
+                    link = child.get("href", "")
+            else:
+                link = _text(child)
+        elif name == "guid" and not entry_id:
+            entry_id = _text(child)
+            if child.get("isPermaLink", "true") != "false":
+                permalink = entry_id = urljoin(url, entry_id)
+        elif name == "id" and not entry_id:
+            entry_id = _text(child)
+        elif name in ("description", "summary") and not summary:
+            summary = _text(child)
+        elif name in ("encoded", "content") and not content:
+            content = _text(child)
+        elif name in ("pubDate", "published", "issued") and not published:
+            # The same elements feedparser reads as the publish date; dc:date
+            # is an update time there, so it is ignored here too.
+            published = _text(child)
+        elif name in ("doi", "identifier") and not doi:
+            doi = _text(child)
+        elif name in ("creator", "author"):
+            author_name = child.find(f"{_ATOM}name")
+            value = _text(author_name) if author_name is not None else _text(child)
+            if value:
+                authors.append(value)
+
+    # Resolve relative URIs against the feed URL, as feedparser does, so both
+    # parsers produce the same fingerprint for the same entry.
+    link = urljoin(url, link) if link else permalink
+    published_at = _parse_date(published)
+    return PaperInput(
+        fingerprint=_fingerprint(entry_id, link, published_at),
+        title=title or "(no title)",
+        authors=", ".join(authors),
+        summary=summary or content,
+        link=link,
+        published_at=published_at,
+        source=url,
+        canonical_key=_canonical_key(entry_id, link, title, doi),
+    )
+
+
+def iter_feed_entries(stream: IO[bytes], url: str, since: datetime | None = None) -> Iterator[PaperInput]:
+    """
+    Incrementally parse an RSS 2.0 / RSS 1.0 / Atom document, yielding one entry at a time.
+
+    Each <item>/<entry> is detached from the tree once yielded, so memory stays
+    bounded by the largest single entry rather than the whole feed. With
+    ``since``, older entries are skipped and reading stops once a run of them
+    shows the rest of the feed is older too.
+    """
+    cutoff = _StaleCutoff(since)
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if _local(elem.tag) in ("item", "entry"):
+            entry = _entry_from_element(elem, url)
+            if stack:
+                stack[-1].remove(elem)
+            elem.clear()
+            if cutoff.stale(entry.published_at):
+                if cutoff.exhausted:
+                    return
+                continue
+            yield entry
+
+
+def stream_feed(
+    url: str,
+    etag: str | None = None,
+    modified: str | None = None,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    since: datetime | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    pool: ConnectionPool | None = None,
+    snapshots: SnapshotStore | None = None,
+) -> FetchResult:
+    """
+    Like fetch_feed_conditional, but parse the response while it downloads.
+
+    Headers are read here; ``entries`` is a lazy iterator that reads and parses
+    the body as it is consumed and closes the connection when exhausted. Its
+    ``parse_seconds`` and ``bytes`` are filled in once the iterator finishes.
+    The body is consumed while entries are stored; as with fetch_feed, the read
+    timeout bounds each socket read and also the whole body. Only time spent
+    waiting on the connection counts towards the latter, not the time the
+    consumer takes between reads; past it the iterator raises TimeoutError. A snapshot is
+    stored only when the body was read to the end.
+    """
+    started = time.perf_counter()
+    response = _open(url, etag, modified, timeout, compressed=False, pool=pool)
+    result = FetchResult(url=url, entries=[], etag=etag, modified=modified, fetch_seconds=time.perf_counter() - started)
+    if response is None:
+        result.not_modified = True
+        return result
+
+    def entries() -> Iterator[PaperInput]:
+        reader = _CountingReader(
+            response, url, max_bytes, keep=snapshots is not None, read_timeout=_split_timeout(timeout)[1]
+        )
+        parse_started = time.perf_counter()
+        with response:
+            yield from iter_feed_entries(reader, url, since=since)
+        result.parse_seconds = time.perf_counter() - parse_started
+        result.bytes = reader.count
+        if snapshots is not None and reader.eof:
+            _save_snapshot(snapshots, url, b"".join(reader.chunks), headers, response.status)
+
+    headers = {k.lower(): v for k, v in response.headers.items()}
+    result.entries = entries()
+    result.etag = response.headers.get("ETag") or etag
+    result.modified = response.headers.get("Last-Modified") or modified
+    return result
+
+
+def parse_feed_stream(
+    body: bytes, url: str, headers: Dict[str, str] | None = None, since: datetime | None = None
+) -> List[PaperInput]:
+    """Parse an in-memory feed with the streaming parser, e.g. to replay a snapshot."""
+    return list(iter_feed_entries(io.BytesIO(body), url, since=since))
+
+
+def _host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def fetch_many(
+    urls: List[str],
+    max_workers: int = 8,
+    per_host: int = 2,
+    fetch: Callable[[str], Any] = fetch_feed,
+    deadline: float | None = None,
+) -> Iterator[Tuple[str, Any, Exception | None]]:
+    """
+    Fetch feeds concurrently and yield (url, result, error) as each one finishes.
+
+    At most ``max_workers`` requests run at once and at most ``per_host`` of them
+    target the same host. Feeds waiting on a busy host do not hold a worker slot.
+    Once ``time.monotonic()`` passes ``deadline`` no new fetch is started; the
+    feeds not yet started are yielded with a BudgetExceeded error.
+    """
+    max_workers = max(1, max_workers)
+    per_host = max(1, per_host)
+    pending = deque(urls)
+    in_flight: Dict[str, int] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while pending or running:
+            if deadline is not None and pending and time.monotonic() >= deadline:
+                while pending:
+                    yield pending.popleft(), None, BudgetExceeded("cycle time budget exhausted")
+                if not running:
+                    break
+            deferred = deque()
+            while pending and len(running) < max_workers:
+                url = pending.popleft()
+                host = _host_of(url)
+                if in_flight.get(host, 0) >= per_host:
+                    deferred.append(url)
+                    continue
+                in_flight[host] = in_flight.get(host, 0) + 1
+                running[pool.submit(fetch, url)] = url
+            pending.extendleft(reversed(deferred))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = running.pop(future)
+                in_flight[_host_of(url)] -= 1
+                try:
+                    yield url, future.result(), None
+                except Exception as e:
+                    yield url, None, e
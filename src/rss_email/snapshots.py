@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+RETENTION_DAYS = 14
+# Pruning walks the whole store; once an hour is plenty.
+PRUNE_INTERVAL_SECONDS = 3600
+_STAMP = "%Y%m%dT%H%M%S%fZ"
+
+
+@dataclass
+class Snapshot:
+    url: str
+    fetched_at: datetime
+    digest: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class SnapshotStore:
+    """
+    Raw feed payloads on disk, for debugging and offline re-ingest.
+
+    Bodies are stored gzip-compressed under their SHA-256, so a feed that has
+    not changed since the last fetch adds only a small index record. Index
+    records live under ``index/<url hash>/<fetch time>.json``; bodies under
+    ``blobs/<digest[:2]>/<digest>.gz``. Records older than ``retention_days``
+    are pruned, and with them every body no record still points to.
+    """
+
+    def __init__(self, root: str, retention_days: int = RETENTION_DAYS) -> None:
+        self.root = root
+        self.retention = timedelta(days=retention_days)
+
+    def _feed_dir(self, url: str) -> str:
+        return os.path.join(self.root, "index", hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.gz")
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Write-then-rename, so a reader never sees a half-written file.
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def save(self, url: str, body: bytes, headers: Dict[str, str], status: int = 200) -> str:
+        """Record one fetched body (decoded, as handed to the parser); returns its digest."""
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        try:
+            # Keeps the blob's mtime at its newest reference, which pruning relies on.
+            os.utime(blob)
+        except FileNotFoundError:
+            self._write(blob, gzip.compress(body, compresslevel=6))
+        fetched_at = datetime.utcnow()
+        record = {
+            "url": url,
+            "fetched_at": fetched_at.isoformat(),
+            "digest": digest,
+            "status": status,
+            "headers": headers,
+        }
+        name = f"{fetched_at.strftime(_STAMP)}.json"
+        self._write(os.path.join(self._feed_dir(url), name), json.dumps(record).encode("utf-8"))
+        return digest
+
+    def _records(self, url: str) -> List[str]:
+        try:
+            return sorted(n for n in os.listdir(self._feed_dir(url)) if n.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    def fetch_times(self, url: str) -> List[datetime]:
+        """When ``url`` was snapshotted, oldest first."""
+        return [datetime.strptime(n[: -len(".json")], _STAMP) for n in self._records(url)]
+
+    def load(self, url: str, at: datetime | None = None) -> Snapshot | None:
+        """The newest snapshot of ``url`` taken at or before ``at`` (UTC; default now)."""
+        names = self._records(url)
+        if at is not None:
+            cutoff = f"{at.strftime(_STAMP)}.json"
+            names = [n for n in names if n <= cutoff]
+        if not names:
+            return None
+        with open(os.path.join(self._feed_dir(url), names[-1]), "r", encoding="utf-8") as f:
+            record = json.load(f)
+        with gzip.open(self._blob_path(record["digest"]), "rb") as f:
+            body = f.read()
+        return Snapshot(
+            url=record["url"],
+            fetched_at=datetime.fromisoformat(record["fetched_at"]),
+            digest=record["digest"],
+            status=record["status"],
+            headers=record["headers"],
+            body=body,
+        )
+
+    def prune(self, now: datetime | None = None, force: bool = False) -> int:
+        """
+        Drop records older than the retention window and the bodies only they
+        referenced; returns the number of files removed.
+
+        Runs at most once per PRUNE_INTERVAL_SECONDS unless ``force`` is set.
+        """
+        marker = os.path.join(self.root, ".pruned")
+        try:
+            if not force and time.time() - os.path.getmtime(marker) < PRUNE_INTERVAL_SECONDS:
+                return 0
+        except FileNotFoundError:
+            pass
+        now = now or datetime.utcnow()
+        cutoff = now - self.retention
+        removed = 0
+        index = os.path.join(self.root, "index")
+        for feed_dir in _subdirs(index):
+            for name in os.listdir(feed_dir):
+                if name.endswith(".json") and name < f"{cutoff.strftime(_STAMP)}.json":
+                    os.unlink(os.path.join(feed_dir, name))
+                    removed += 1
+            if not os.listdir(feed_dir):
+                os.rmdir(feed_dir)
+        # A body is touched whenever a record points to it, so one not touched
+        # since the cutoff is only referenced by records that are now gone.
+        oldest = cutoff.replace(tzinfo=timezone.utc).timestamp()
+        for blob_dir in _subdirs(os.path.join(self.root, "blobs")):
+            for name in os.listdir(blob_dir):
+                path = os.path.join(blob_dir, name)
+                if os.path.getmtime(path) < oldest:
+                    os.unlink(path)
+                    removed += 1
+            if not os.listdir(blob_dir):
+                os.rmdir(blob_dir)
+        os.makedirs(self.root, exist_ok=True)
+        with open(marker, "w"):
+            pass
+        return removed
+
+
+def _subdirs(path: str) -> List[str]:
+    try:
+        return [entry.path for entry in os.scandir(path) if entry.is_dir()]
+    except FileNotFoundError:
+        return []
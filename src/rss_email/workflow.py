@@ -1,13 +1,61 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .config import Settings
-from .db import Paper, get_paper
+from .db import (
+    Digest,
+    Feed,
+    FeedState,
+    Group,
+    Paper,
+    bulk_insert_papers,
+    due_digests,
+    existing_canonical_keys,
+    existing_paper_ids,
+    get_digest,
+    get_or_create_feed_state,
+    load_feed_ids,
+    load_feed_states,
+    prune_digests,
+    sync_sources,
+)
 from .email_client import EmailClient
-from .rss_client import fetch_feed
+from .health import FeedBreaker
+from .http_pool import shared_pool
+from .metrics import NULL_SINK, MetricsSink
+from .render import (
+    DEFAULT_SUMMARY_CHARS,
+    render_digest_html,
+    render_digest_text,
+    render_no_new_html,
+    render_no_new_text,
+)
+from .rss_client import (
+    BudgetExceeded,
+    FetchResult,
+    PaperInput,
+    ParserPool,
+    fetch_feed_conditional,
+    fetch_many,
+    parse_feed_stream,
+    replay_feed,
+    stream_feed,
+)
+from .snapshots import SnapshotStore
+
+INGEST_CHUNK_SIZE = 500
 
 
 def _resolve_recipients(settings: Settings, group_name: str) -> tuple[List[str], List[str], List[str]]:
@@ -21,92 +69,346 @@ def _resolve_recipients(settings: Settings, group_name: str) -> tuple[List[str],
     raise ValueError(f"No recipient configuration for group '{group_name}'")
 
 
-def ingest_feeds(settings: Settings, session: Session) -> int:
-    created = 0
-    for group_name, urls in settings.rss_groups.items():
-        for url in urls:
-            try:
-                entries = fetch_feed(url)
-                for entry in entries:
-                    if get_paper(session, entry.fingerprint):
-                        continue
-                    paper = Paper(
-                        id=entry.fingerprint,
-                        title=entry.title,
-                        authors=entry.authors,
-                        summary=entry.summary,
-                        link=entry.link,
-                        published_at=entry.published_at,
-                        source=url,
-                        inserted_at=datetime.utcnow(),
-                    )
-                    session.add(paper)
-                    created += 1
-            except Exception as e:
-                print(f"[ERROR] Failed to ingest feed {url}: {e}")
+class _IngestRun:
+    """
+    State shared by every feed of one ingest run.
+
+    Rows go in through bulk inserts, never ``session.add``, so nothing piles
+    up in the identity map. Progress is committed after every feed, or every
+    ``commit_rows`` new rows when that is set, so a crash late in a large
+    import keeps what was already stored. A ``replay`` run stores entries
+    only: feed state (validators, watermark, breaker) is left as it was.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        commit_rows: int = 0,
+        metrics: MetricsSink = NULL_SINK,
+        breaker: FeedBreaker | None = None,
+        replay: bool = False,
+    ) -> None:
+        self.session = session
+        self.commit_rows = commit_rows
+        self.metrics = metrics
+        self.breaker = breaker or FeedBreaker()
+        self.replay = replay
+        # Fingerprints and canonical keys written during this run; catches the
+        # same paper in two feeds.
+        self.seen: Set[str] = set()
+        # Feeds not fetched because the cycle's time budget ran out.
+        self.skipped: List[str] = []
+        self._pending = 0
+
+    def stored(self, rows: int) -> None:
+        self._pending += rows
+        if self.commit_rows and self._pending >= self.commit_rows:
+            self.commit()
+
+    def feed_done(self) -> None:
+        if not self.commit_rows:
+            self.commit()
+
+    def commit(self) -> None:
+        with self.metrics.timer("ingest_commit_seconds"):
+            self.session.commit()
+        self._pending = 0
+
+    def report_skipped(self) -> None:
+        self.metrics.emit("feeds_skipped_budget", len(self.skipped))
+        if self.skipped:
+            print(f"[WARNING] Cycle time budget used up; skipped {len(self.skipped)} feeds: {', '.join(self.skipped)}")
+
+
+def _store_entries(
+    run: _IngestRun, feed_id: int, entries: Iterable[PaperInput]
+) -> Tuple[int, int, datetime | None]:
+    """
+    Insert the unseen entries of one feed in chunks.
+
+    Returns (entries read, new rows, newest published_at among the entries).
+    """
+    session, seen = run.session, run.seen
+    total = created = 0
+    newest: datetime | None = None
+    it = iter(entries)
+    while True:
+        chunk = list(islice(it, INGEST_CHUNK_SIZE))
+        if not chunk:
+            return total, created, newest
+        total += len(chunk)
+        for entry in chunk:
+            if entry.published_at and (newest is None or entry.published_at > newest):
+                newest = entry.published_at
+        # An entry is new only if neither its fingerprint nor its canonical
+        # key is known, so the same paper arriving through a second feed or
+        # with a new timestamp is stored once.
+        candidates: Dict[str, PaperInput] = {}
+        chunk_keys: Set[str] = set()
+        for entry in chunk:
+            key = entry.canonical_key
+            if entry.fingerprint in seen or entry.fingerprint in candidates:
+                continue
+            if key and (key in seen or key in chunk_keys):
                 continue
-    session.commit()
+            candidates[entry.fingerprint] = entry
+            if key:
+                chunk_keys.add(key)
+        existing = existing_paper_ids(session, candidates.keys())
+        known_keys = existing_canonical_keys(session, chunk_keys)
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": entry.fingerprint,
+                "title": entry.title,
+                "authors": entry.authors,
+                "summary": entry.summary,
+                "link": entry.link,
+                "published_at": entry.published_at,
+                "feed_id": feed_id,
+                "canonical_key": entry.canonical_key or None,
+                "inserted_at": now,
+            }
+            for fp, entry in candidates.items()
+            if fp not in existing and entry.canonical_key not in known_keys
+        ]
+        bulk_insert_papers(session, rows)
+        seen.update(candidates.keys())
+        seen.update(chunk_keys)
+        created += len(rows)
+        run.stored(len(rows))
+
+
+def _feed_ids(settings: Settings, session: Session) -> Dict[str, int]:
+    """Feed ids by URL, syncing the feeds table first if a configured URL is missing."""
+    feed_ids = load_feed_ids(session)
+    if any(url not in feed_ids for url in settings.rss_urls):
+        feed_ids = sync_sources(session, settings.rss_groups)
+    return feed_ids
+
+
+def _cycle_deadline(settings: Settings) -> float | None:
+    """time.monotonic() after which no new fetch starts, or None without a budget."""
+    if settings.cycle_budget_seconds <= 0:
+        return None
+    return time.monotonic() + settings.cycle_budget_seconds
+
+
+def _make_breaker(settings: Settings) -> FeedBreaker:
+    return FeedBreaker(settings.feed_failure_threshold, settings.feed_backoff_minutes, settings.feed_backoff_max_hours)
+
+
+def _feeds_to_fetch(
+    urls: List[str], states: Dict[str, FeedState], breaker: FeedBreaker, metrics: MetricsSink = NULL_SINK
+) -> List[str]:
+    """Drop feeds whose circuit is open; feeds whose backoff has expired are kept as probes."""
+    now = datetime.utcnow()
+    skipped = [url for url in urls if breaker.is_open(states.get(url), now)]
+    metrics.emit("feeds_skipped_disabled", len(skipped))
+    if skipped:
+        print(f"[INFO] Skipping {len(skipped)} disabled feeds")
+    return [url for url in urls if url not in skipped]
+
+
+def _snapshot_store(settings: Settings) -> SnapshotStore | None:
+    if not settings.snapshot_dir:
+        return None
+    return SnapshotStore(settings.snapshot_dir, settings.snapshot_retention_days)
+
+
+def _make_fetcher(
+    settings: Settings, states: Dict[str, FeedState], replay_at: datetime | None = None
+) -> Tuple[Callable[[str], FetchResult], ParserPool]:
+    """
+    Build the per-URL fetch function (validators, watermark cutoff, parser) for one ingest run.
+
+    With ``replay_at`` feeds are read from the snapshot store as of that time
+    (UTC) instead of the network, and every stored entry is parsed regardless
+    of the watermark.
+    """
+    validators = {url: (state.etag, state.modified) for url, state in states.items()}
+    streaming = settings.feed_parser == "stream"
+    # Stream mode parses while downloading, so it never uses the process pool.
+    parser = ParserPool(0 if streaming else settings.parse_workers)
+    snapshots = _snapshot_store(settings)
+    if replay_at is not None:
+        if snapshots is None:
+            raise ValueError("Replay needs SNAPSHOT_DIR to point at a snapshot store")
+        parse = parse_feed_stream if streaming else parser.parse
+
+        def replay(url: str) -> FetchResult:
+            etag, modified = validators.get(url, (None, None))
+            return replay_feed(url, snapshots, replay_at, etag=etag, modified=modified, parse=parse)
+
+        return replay, parser
+    if snapshots is not None:
+        try:
+            snapshots.prune()
+        except OSError as e:
+            print(f"[WARNING] Could not prune snapshot store {settings.snapshot_dir}: {e}")
+    cutoffs: Dict[str, datetime] = {}
+    if settings.incremental_fetch:
+        # Look back past the watermark so late or re-dated entries still get in.
+        overlap = timedelta(hours=settings.watermark_overlap_hours)
+        cutoffs = {url: state.watermark - overlap for url, state in states.items() if state.watermark}
+
+    options = {
+        "timeout": (settings.fetch_connect_timeout, settings.fetch_read_timeout),
+        "max_bytes": settings.fetch_max_bytes,
+        # Kept across runs, so feeds on one host share keep-alive connections.
+        "pool": shared_pool if settings.http_keepalive else None,
+        "snapshots": snapshots,
+    }
+
+    def fetch(url: str) -> FetchResult:
+        etag, modified = validators.get(url, (None, None))
+        since = cutoffs.get(url)
+        if streaming:
+            return stream_feed(url, etag=etag, modified=modified, since=since, **options)
+        return fetch_feed_conditional(url, etag=etag, modified=modified, since=since, parse=parser.parse, **options)
+
+    return fetch, parser
+
+
+def _ingest_result(
+    run: _IngestRun,
+    states: Dict[str, FeedState],
+    feed_ids: Dict[str, int],
+    url: str,
+    result: FetchResult | None,
+    error: Exception | None,
+) -> int:
+    """Store one fetched feed and update its feed_state; returns the number of new rows."""
+    metrics = run.metrics
+    if isinstance(error, BudgetExceeded):
+        # Not the feed's fault: no failure is recorded against it.
+        run.skipped.append(url)
+        return 0
+    if error is None and result.error:
+        error = result.error
+    if error is not None:
+        _record_failure(run, states, url, error)
+        return 0
+    try:
+        total, new, newest = _store_entries(run, feed_ids[url], result.entries)
+        metrics.emit("feed_fetch_seconds", result.fetch_seconds, feed=url)
+        metrics.emit("feed_parse_seconds", result.parse_seconds, feed=url)
+        metrics.emit("feed_bytes", result.bytes, feed=url)
+        metrics.emit("feed_not_modified", int(result.not_modified), feed=url)
+        metrics.emit("feed_entries", total, feed=url)
+        metrics.emit("feed_new_entries", new, feed=url)
+        metrics.emit("feed_dedup_hits", total - new, feed=url)
+        if run.replay:
+            # A snapshot says nothing about the feed's health now, and a
+            # missing one is not a success.
+            run.feed_done()
+            return new
+        # Store validators only once the body has been taken in, so a
+        # failed feed is downloaded in full again next time.
+        state = get_or_create_feed_state(run.session, states, url)
+        state.etag = result.etag
+        state.modified = result.modified
+        state.checked_at = datetime.utcnow()
+        run.breaker.record_success(state)
+        if newest:
+            # Ignore future-dated entries so one bad date cannot hide the feed.
+            newest = min(newest, state.checked_at)
+            if state.watermark is None or newest > state.watermark:
+                state.watermark = newest
+        run.feed_done()
+        return new
+    except Exception as e:
+        _record_failure(run, states, url, e)
+        return 0
+
+
+def _record_failure(run: _IngestRun, states: Dict[str, FeedState], url: str, error: object) -> None:
+    print(f"[ERROR] Failed to ingest feed {url}: {error}")
+    run.metrics.emit("feed_errors", 1, feed=url)
+    if not run.replay:
+        state = get_or_create_feed_state(run.session, states, url)
+        run.breaker.record_failure(state, error, datetime.utcnow())
+    run.feed_done()
+
+
+def ingest_feeds(
+    settings: Settings,
+    session: Session,
+    metrics: MetricsSink = NULL_SINK,
+    urls: List[str] | None = None,
+    replay_at: datetime | None = None,
+    skipped: List[str] | None = None,
+) -> int:
+    """
+    Fetch and store ``urls`` (every configured feed by default); returns the number of new papers.
+
+    Feeds not fetched because the cycle budget ran out are appended to
+    ``skipped`` when a list is given.
+
+    With ``replay_at`` the feeds are read from the snapshot store instead (see
+    ``_make_fetcher``); disabled feeds and the cycle budget are ignored then,
+    and the feeds' state is not updated.
+    """
+    created = 0
+    feed_ids = _feed_ids(settings, session)
+    states = load_feed_states(session)
+    breaker = _make_breaker(settings)
+    urls = settings.rss_urls if urls is None else urls
+    if replay_at is None:
+        urls = _feeds_to_fetch(urls, states, breaker, metrics)
+    fetch, parser = _make_fetcher(settings, states, replay_at)
+    results = fetch_many(
+        urls,
+        max_workers=settings.fetch_workers,
+        per_host=settings.fetch_per_host,
+        fetch=fetch,
+        deadline=_cycle_deadline(settings) if replay_at is None else None,
+    )
+    run = _IngestRun(session, settings.ingest_commit_rows, metrics, breaker, replay=replay_at is not None)
+    # Fetches run on worker threads (parsing on the process pool when enabled);
+    # all DB writes stay on this thread. In stream mode the body is parsed here
+    # instead, chunk by chunk, as it is stored.
+    with parser:
+        for url, result, error in results:
+            created += _ingest_result(run, states, feed_ids, url, result, error)
+    run.commit()
+    run.report_skipped()
+    if skipped is not None:
+        skipped.extend(run.skipped)
     return created
 
 
-def _format_date(dt: datetime | None) -> str:
-    if not dt:
-        return ""
-    return dt.strftime("%Y-%m-%d %H:%M")
-
-
-def _build_email_html(papers: List[Paper], group_name: str) -> str:
-    items = []
-    for p in papers:
-        published = _format_date(p.published_at)
-        items.append(
-            f"<li><a href='{p.link}'>{p.title}</a>"
-            f"<br/><small>{p.authors or ''} | {published} | {p.source}</small>"
-            f"<p>{p.summary}</p></li>"
-        )
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    body = """
-    <html>
-        <body>
-            <p>Latest papers for group: {group}</p>
-            <ul>
-                {items}
-            </ul>
-            <p>Generated at {ts}</p>
-        </body>
-    </html>
-    """
-    return body.format(items="\n".join(items), ts=timestamp, group=group_name)
-
-
-def _build_email_text(papers: List[Paper], group_name: str) -> str:
-    lines = []
-    lines.append(f"Group: {group_name}\n")
-    for p in papers:
-        published = _format_date(p.published_at)
-        lines.append(f"{p.title}\n{p.authors or 'Unknown authors'} | {published} | {p.source}\n{p.link}\n")
-    return "\n".join(lines)
+def _build_email_html(papers: List[Paper], group_name: str, summary_limit: int = DEFAULT_SUMMARY_CHARS) -> str:
+    return render_digest_html(papers, group_name, summary_limit)
+
+
+def _build_email_text(papers: List[Paper], group_name: str, summary_limit: int = DEFAULT_SUMMARY_CHARS) -> str:
+    return render_digest_text(papers, group_name, summary_limit)
 
 
 def _build_no_new_html(group_name: str) -> str:
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    body = """
-    <html>
-      <body>
-        <p>No new papers for group: {group}</p>
-        <p>Generated at {ts}</p>
-      </body>
-    </html>
-    """
-    return body.format(group=group_name, ts=timestamp)
+    return render_no_new_html(group_name)
 
 
 def _build_no_new_text(group_name: str) -> str:
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    return f"No new papers for group: {group_name}\nGenerated at {timestamp}"
+    return render_no_new_text(group_name)
+
 
+def _get_unsent_recent(
+    session: Session,
+    days: int = 15,
+    group: str | None = None,
+    include_ungrouped: bool = False,
+    limit: int | None = None,
+) -> List[Paper]:
+    """
+    Unsent papers inserted in the last ``days`` days, newest first.
 
-def _get_unsent_recent(session: Session, days: int = 15) -> List[Paper]:
+    ``group`` restricts the result to feeds of that group; with
+    ``include_ungrouped`` papers from feeds outside every group match as well.
+    ``limit`` is applied in the query, so at most that many rows are loaded
+    whatever the backlog.
+    """
     cutoff = datetime.now() - timedelta(days=days)
     stmt = (
         select(Paper)
@@ -114,49 +416,334 @@ def _get_unsent_recent(session: Session, days: int = 15) -> List[Paper]:
         .where(Paper.inserted_at >= cutoff)
         .order_by(Paper.published_at.desc().nullslast(), Paper.created_at.desc())
     )
+    if group is not None:
+        stmt = stmt.outerjoin(Feed, Paper.feed_id == Feed.id).outerjoin(Group, Feed.group_id == Group.id)
+        condition = Group.name == group
+        if include_ungrouped:
+            condition = or_(condition, Feed.group_id.is_(None))
+        stmt = stmt.where(condition)
+    if limit:
+        stmt = stmt.limit(limit)
     return list(session.execute(stmt).scalars())
 
 
-def send_unsent(settings: Settings, session: Session, email_client: EmailClient) -> dict:
-    unsent = _get_unsent_recent(session, days=15)
+def _group_sources(settings: Settings) -> Dict[str, List[str]]:
+    """Feed URLs whose papers are mailed to each configured group."""
+    sources: Dict[str, List[str]] = {group: [] for group in settings.rss_groups}
+    for url, group in settings.url_to_group.items():
+        sources.setdefault(group, []).append(url)
+    return sources
 
-    grouped: Dict[str, List[Paper]] = {}
-    for paper in unsent:
-        group = settings.url_to_group.get(paper.source, "Default")
-        grouped.setdefault(group, []).append(paper)
 
-    configured_groups = list(settings.rss_groups.keys()) if settings.rss_groups else ["Default"]
-    all_groups = list({*configured_groups, *grouped.keys()})
+@dataclass
+class _Digest:
+    group: str
+    to: List[str]
+    cc: List[str]
+    bcc: List[str]
+    subject: str
+    html: str
+    text: str
+    papers: List[Paper]
+    # connect / login / send seconds reported by the client that delivered it
+    timings: Dict[str, float] = field(default_factory=dict)
+    # The persisted copy; marked sent once delivery succeeds.
+    stored: Digest | None = None
 
-    total_sent = 0
-    for group_name in all_groups:
-        papers = grouped.get(group_name, [])
-        batch = papers[: settings.batch_limit] if settings.batch_limit else papers
-        to_list, cc_list, bcc_list = _resolve_recipients(settings, group_name)
 
-        print(
-            f"[Mail Plan] Group={group_name} To={to_list or ['(none)']} CC={cc_list or ['(none)']} BCC={bcc_list or ['(none)']} Items={len(batch)}"
-        )
+def _send_digest(email_client: EmailClient, digest: _Digest) -> None:
+    try:
+        email_client.send(digest.to, digest.subject, digest.html, digest.text, cc=digest.cc, bcc=digest.bcc)
+    finally:
+        digest.timings = dict(email_client.last_timings)
 
+
+def _dispatch(
+    email_client: EmailClient, digests: List[_Digest], workers: int
+) -> Iterator[Tuple[_Digest, Exception | None]]:
+    """Send digests over up to ``workers`` SMTP connections, yielding (digest, error) as each finishes."""
+    if workers <= 1 or len(digests) <= 1:
+        with email_client.session():
+            for digest in digests:
+                try:
+                    _send_digest(email_client, digest)
+                except Exception as e:
+                    yield digest, e
+                    continue
+                yield digest, None
+        return
+
+    jobs: "queue.Queue[_Digest]" = queue.Queue()
+    for digest in digests:
+        jobs.put(digest)
+    done: "queue.Queue[Tuple[_Digest, Exception | None]]" = queue.Queue()
+
+    def worker() -> None:
+        client = email_client.clone()
+        with client.session():
+            while True:
+                try:
+                    digest = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    _send_digest(client, digest)
+                except Exception as e:
+                    done.put((digest, e))
+                    continue
+                done.put((digest, None))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(workers, len(digests)))]
+    for t in threads:
+        t.start()
+    for _ in digests:
+        yield done.get()
+    for t in threads:
+        t.join()
+
+
+def _unsent_for_group(settings: Settings, session: Session, group_name: str) -> List[Paper] | None:
+    """
+    Load at most ``batch_limit`` unsent papers for one group.
+
+    "Default" also takes papers from feeds that are no longer in any group.
+    Returns None when "Default" has nothing to send and is not a group of its
+    own, so no empty digest goes out for it.
+    """
+    limit = settings.batch_limit or None
+    if group_name != "Default":
+        return _get_unsent_recent(session, days=15, group=group_name, limit=limit)
+    papers = _get_unsent_recent(session, days=15, group="Default", include_ungrouped=True, limit=limit)
+    if not papers and "Default" not in settings.rss_groups and settings.rss_groups:
+        return None
+    return papers
+
+
+def _plan_digest(
+    settings: Settings, group_name: str, papers: List[Paper], metrics: MetricsSink = NULL_SINK
+) -> _Digest:
+    batch = papers[: settings.batch_limit] if settings.batch_limit else papers
+    to_list, cc_list, bcc_list = _resolve_recipients(settings, group_name)
+
+    print(
+        f"[Mail Plan] Group={group_name} To={to_list or ['(none)']} CC={cc_list or ['(none)']} BCC={bcc_list or ['(none)']} Items={len(batch)}"
+    )
+
+    with metrics.timer("render_seconds", group=group_name):
         if batch:
             subject = f"{settings.mail_subject_prefix} [{group_name}] {len(batch)} new papers"
-            html_body = _build_email_html(batch, group_name)
-            text_body = _build_email_text(batch, group_name)
-            email_client.send(to_list, subject, html_body, text_body, cc=cc_list, bcc=bcc_list)
-            for p in batch:
-                p.sent = True
-            total_sent += len(batch)
+            html_body = _build_email_html(batch, group_name, settings.summary_max_chars)
+            text_body = _build_email_text(batch, group_name, settings.summary_max_chars)
         else:
             subject = f"{settings.mail_subject_prefix} [{group_name}] No new papers"
             html_body = _build_no_new_html(group_name)
             text_body = _build_no_new_text(group_name)
-            email_client.send(to_list, subject, html_body, text_body, cc=cc_list, bcc=bcc_list)
+    return _Digest(group_name, to_list, cc_list, bcc_list, subject, html_body, text_body, batch)
+
+
+def _digest_cycle(settings: Settings, now: datetime | None = None) -> str:
+    """The digest day in SCHEDULE_TZ; each group gets at most one digest per cycle."""
+    try:
+        tz = ZoneInfo(settings.schedule_tz)
+    except Exception:
+        tz = None
+    return (now or datetime.now(tz)).date().isoformat()
+
+
+def _store_digest(session: Session, digest: _Digest, cycle: str) -> Digest | None:
+    """
+    Queue a freshly built digest in the outbox.
+
+    Its papers are marked sent in the same transaction, so no other digest
+    picks them up while this one waits for delivery. Returns None if another
+    run queued this group's digest for the cycle first; that one is sent.
+    """
+    stored = Digest(
+        group_name=digest.group,
+        cycle=cycle,
+        paper_ids=json.dumps([p.id for p in digest.papers]),
+        recipients=json.dumps({"to": digest.to, "cc": digest.cc, "bcc": digest.bcc}),
+        subject=digest.subject,
+        html=digest.html,
+        text=digest.text,
+        status="pending",
+        attempts=0,
+    )
+    session.add(stored)
+    for p in digest.papers:
+        p.sent = True
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        print(f"[INFO] Digest for group {digest.group} (cycle {cycle}) was built by another run; skipping")
+        return None
+    return stored
+
+
+def _load_digest(stored: Digest) -> _Digest:
+    """Rebuild a digest from its outbox row, without querying or rendering again."""
+    recipients = json.loads(stored.recipients)
+    return _Digest(
+        stored.group_name,
+        recipients["to"],
+        recipients["cc"],
+        recipients["bcc"],
+        stored.subject,
+        stored.html,
+        stored.text,
+        [],
+        stored=stored,
+    )
+
+
+def _prepare_digest(
+    settings: Settings, session: Session, group_name: str, cycle: str, metrics: MetricsSink = NULL_SINK
+) -> _Digest | None:
+    """
+    Build and queue one group's digest for ``cycle``, or return None if the
+    cycle already has one.
+
+    A queued digest that failed to send is retried from the outbox as stored
+    (see deliver_outbox); it is never queried or rendered again.
+    """
+    stored = get_digest(session, group_name, cycle)
+    if stored is not None:
+        if stored.status == "sent":
+            print(f"[INFO] Digest for group {group_name} already sent in cycle {cycle}; skipping")
+        elif stored.status == "pending":
+            print(f"[INFO] Digest for group {group_name} (cycle {cycle}) is queued for retry")
+        return None
+
+    with metrics.timer("unsent_query_seconds", group=group_name):
+        papers = _unsent_for_group(settings, session, group_name)
+    if papers is None:
+        return None
+    digest = _plan_digest(settings, group_name, papers, metrics)
+    digest.stored = _store_digest(session, digest, cycle)
+    return digest if digest.stored is not None else None
+
+
+def _release_papers(session: Session, stored: Digest) -> None:
+    # The digest is given up on; its papers go into the next one instead.
+    ids = json.loads(stored.paper_ids)
+    if ids:
+        session.execute(update(Paper).where(Paper.id.in_(ids)).values(sent=False))
+
+
+def _record_delivery(
+    settings: Settings, session: Session, digest: _Digest, error: Exception | None, metrics: MetricsSink = NULL_SINK
+) -> int:
+    """
+    Record one delivery attempt on the digest's outbox row and commit.
+
+    A failed attempt is retried after OUTBOX_BACKOFF_MINUTES, doubling each
+    time. After OUTBOX_MAX_ATTEMPTS the digest is marked failed and its
+    papers are released. Returns the number of papers delivered.
+    """
+    for stage, seconds in digest.timings.items():
+        metrics.emit(f"smtp_{stage}_seconds", seconds, group=digest.group)
+    stored = digest.stored
+    stored.attempts = (stored.attempts or 0) + 1
+    now = datetime.utcnow()
+    if error is not None:
+        print(f"[ERROR] Failed to send group {digest.group}: {error}")
+        metrics.emit("send_failures", 1, group=digest.group)
+        stored.last_error = str(error)[:500]
+        if stored.attempts >= max(1, settings.outbox_max_attempts):
+            print(f"[WARNING] Giving up on digest for group {digest.group} after {stored.attempts} attempts")
+            stored.status = "failed"
+            _release_papers(session, stored)
+        else:
+            backoff = timedelta(minutes=settings.outbox_backoff_minutes) * 2 ** (stored.attempts - 1)
+            stored.next_attempt_at = now + backoff
+        session.commit()
+        return 0
+    # Commit per message so a later failure cannot resend this one.
+    stored.status = "sent"
+    stored.sent_at = now
+    stored.last_error = None
+    with metrics.timer("send_commit_seconds", group=digest.group):
+        session.commit()
+    sent = len(json.loads(stored.paper_ids))
+    metrics.emit("papers_sent", sent, group=digest.group)
+    return sent
+
+
+def _due_digests(session: Session, exclude: Set[int] | None = None) -> List[_Digest]:
+    """Queued digests whose next attempt is due, oldest first."""
+    exclude = exclude or set()
+    return [_load_digest(stored) for stored in due_digests(session, datetime.utcnow()) if stored.id not in exclude]
+
+
+def _prune_digests(settings: Settings, session: Session) -> None:
+    if settings.digest_retention_days > 0:
+        if prune_digests(session, datetime.utcnow() - timedelta(days=settings.digest_retention_days)):
+            session.commit()
+
+
+def deliver_outbox(
+    settings: Settings,
+    session: Session,
+    email_client: EmailClient,
+    metrics: MetricsSink = NULL_SINK,
+    digests: List[_Digest] | None = None,
+) -> dict:
+    """
+    Send ``digests`` (every due digest in the outbox by default), recording
+    each result as it comes in.
+
+    Each message is committed on its own, so one failure costs only that
+    message: it is retried on a later call, the others are not resent.
+    """
+    if digests is None:
+        digests = _due_digests(session)
+    metrics.emit("outbox_due", len(digests))
+    total_sent = 0
+    failed: List[str] = []
+    for digest, error in _dispatch(email_client, digests, settings.send_workers):
+        if error is not None:
+            failed.append(digest.group)
+        total_sent += _record_delivery(settings, session, digest, error, metrics)
+    return {"sent": total_sent, "groups": len(digests), "failed": failed}
+
+
+def send_unsent(
+    settings: Settings,
+    session: Session,
+    email_client: EmailClient,
+    metrics: MetricsSink = NULL_SINK,
+    cycle: str | None = None,
+) -> dict:
+    """
+    Queue each group's digest for ``cycle`` (today in SCHEDULE_TZ by default),
+    then deliver everything due in the outbox, including earlier retries.
+    """
+    groups = [g for g in settings.rss_groups if g != "Default"] + ["Default"]
+    cycle = cycle or _digest_cycle(settings)
+    _prune_digests(settings, session)
+
+    # One LIMIT query per group: memory follows batch_limit, not the backlog.
+    # Every digest is rendered and queued up front so sending never waits on
+    # the database.
+    for group in groups:
+        _prepare_digest(settings, session, group, cycle, metrics)
+    return deliver_outbox(settings, session, email_client, metrics)
 
-    session.commit()
-    return {"sent": total_sent, "groups": len(all_groups)}
 
+def run_cycle(
+    settings: Settings,
+    session: Session,
+    email_client: EmailClient,
+    metrics: MetricsSink = NULL_SINK,
+    cycle: str | None = None,
+) -> dict:
+    # Synchronous entry point kept for existing callers; the cycle itself is
+    # the overlapping pipeline in pipeline.run_cycle_async.
+    from .pipeline import run_cycle_async
 
-def run_cycle(settings: Settings, session: Session, email_client: EmailClient) -> dict:
-    ingested = ingest_feeds(settings, session)
-    sent_info = send_unsent(settings, session, email_client)
-    return {"ingested": ingested, **sent_info}
+    try:
+        with metrics.timer("cycle_seconds"):
+            return asyncio.run(run_cycle_async(settings, session, email_client, metrics, cycle))
+    finally:
+        metrics.flush()
@@ -0,0 +1,87 @@
+"""Local SMTP stand-in for testing mail delivery offline.
+
+Accepts every message and discards it (or prints its headers with
+--verbose), counting connections and messages so that connection reuse can
+be checked without a real mail server. Speaks just enough SMTP for smtplib:
+no TLS and no AUTH, so point the client at it with SMTP_STARTTLS=false and
+an empty SMTP_USER.
+
+Usage:
+    python -m src.smtp_sink --port 1025
+    SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_STARTTLS=false SMTP_USER= python src/test_email.py
+"""
+
+import argparse
+import socketserver
+import threading
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """One SMTP session; the counters live on the server (see make_server)."""
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.wfile.write(b"220 local sink\r\n")
+        in_data = False
+        headers = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.messages += 1
+                    if self.server.verbose:
+                        print(f"[sink] message {self.server.messages}: {' | '.join(headers)}")
+                    headers = []
+                    self.wfile.write(b"250 OK\r\n")
+                elif self.server.verbose and line.split(b":", 1)[0].lower() in (b"subject", b"to", b"cc"):
+                    headers.append(line.decode("utf-8", "replace").strip())
+                continue
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self.wfile.write(b"250 local sink\r\n")
+            elif command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, verbose: bool = False) -> socketserver.ThreadingTCPServer:
+    """A sink bound to ``host:port`` (0 = any free port); call serve_forever() to run it."""
+    server = socketserver.ThreadingTCPServer((host, port), SMTPSinkHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.messages = 0
+    server.verbose = verbose
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink that accepts and discards mail.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--verbose", action="store_true", help="print To/Cc/Subject of each message")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, verbose=args.verbose)
+    print(f"SMTP sink listening on {args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.messages} messages over {server.connections} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,8 @@ def main() -> None:
         settings.smtp_user,
         settings.smtp_pass,
         settings.smtp_sender,
+        max_messages_per_connection=settings.smtp_max_messages_per_connection,
+        starttls=settings.smtp_starttls,
     )
 
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -0,0 +1,66 @@
+"""The watermark cutoff must not lose entries of feeds that list oldest first."""
+
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.benchmark import make_feed
+from src.rss_email.rss_client import STALE_RUN_LIMIT, parse_feed_bytes, parse_feed_stream
+
+FEED_URL = "https://example.org/feed.rss"
+# make_feed dates entry i at 2024-01-01 + i hours, oldest first.
+START = datetime(2024, 1, 1)
+
+
+def _items(entries) -> bytes:
+    return make_feed("f", 0).replace(b"</channel>", b"".join(entries) + b"</channel>")
+
+
+def _item(i: int) -> bytes:
+    published = START + timedelta(hours=i)
+    return (
+        f"<item><title>f paper {i}</title><guid isPermaLink='false'>f-{i}</guid>"
+        f"<link>https://example.org/f/paper-{i}</link>"
+        f"<pubDate>{published.strftime('%a, %d %b %Y %H:%M:%S')} GMT</pubDate></item>"
+    ).encode()
+
+
+class StaleCutoffTest(unittest.TestCase):
+    parsers = (parse_feed_bytes, parse_feed_stream)
+
+    def test_oldest_first_feed_keeps_new_entries(self):
+        # 30 entries already stored, 10 newer ones appended at the end.
+        body = make_feed("f", 40)
+        since = START + timedelta(hours=29)
+        for parse in self.parsers:
+            titles = [e.title for e in parse(body, FEED_URL, since=since)]
+            self.assertEqual(titles, [f"f paper {i}" for i in range(29, 40)], parse.__name__)
+
+    def test_newest_first_feed_stops_after_stale_run(self):
+        # Newest first; after STALE_RUN_LIMIT old entries the rest is not read,
+        # so the misplaced new entry at the end is not reached.
+        order = [50, 49, *range(10, 10 - STALE_RUN_LIMIT, -1), 60]
+        body = _items([_item(i) for i in order])
+        since = START + timedelta(hours=20)
+        for parse in self.parsers:
+            titles = [e.title for e in parse(body, FEED_URL, since=since)]
+            self.assertEqual(titles, ["f paper 50", "f paper 49"], parse.__name__)
+
+    def test_unordered_feed_is_read_to_the_end(self):
+        # One step up at the start is enough to rule out stopping early.
+        order = [10, 50, *range(9, 9 - STALE_RUN_LIMIT, -1), 60, 5, 61]
+        body = _items([_item(i) for i in order])
+        since = START + timedelta(hours=20)
+        for parse in self.parsers:
+            titles = [e.title for e in parse(body, FEED_URL, since=since)]
+            self.assertEqual(titles, ["f paper 50", "f paper 60", "f paper 61"], parse.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""The feedparser and streaming parsers must agree on what identifies an entry."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rss_email.rss_client import _canonical_key, parse_feed_bytes, parse_feed_stream
+
+FEED_URL = "https://example.org/feed.rss"
+
+RSS2 = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>t</title>
+<item><title>Relative link</title><link>/papers/1</link><guid isPermaLink="false">p-1</guid>
+  <pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate><dc:creator>Alice</dc:creator></item>
+<item><title>Permalink guid</title><guid>https://example.org/papers/2</guid>
+  <pubDate>Tue, 02 Jan 2024 10:00:00 +0200</pubDate></item>
+<item><title>Only dc:date</title><link>https://example.org/papers/3</link><dc:date>2024-01-03T10:00:00Z</dc:date></item>
+<item><title>Undated</title><link>https://example.org/papers/4?utm_source=rss</link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title>Published</title><id>urn:1</id><link rel="alternate" href="https://example.org/a/1"/>
+  <published>2024-02-01T08:00:00Z</published><updated>2024-02-05T08:00:00Z</updated></entry>
+<entry><title>Only updated</title><id>urn:2</id><link href="https://example.org/a/2"/>
+  <updated>2024-02-02T08:00:00Z</updated></entry>
+</feed>"""
+
+# RSS 1.0 as served by e.g. nature.com: dates in dc:date, sometimes dcterms:issued.
+RDF = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+  xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/"
+  xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/">
+<channel rdf:about="https://example.org/"><title>t</title></channel>
+<item rdf:about="https://example.org/articles/s1"><title>dc:date only</title>
+  <link>https://example.org/articles/s1</link><dc:date>2024-05-01</dc:date><prism:doi>10.1038/s1</prism:doi></item>
+<item rdf:about="https://example.org/articles/s2"><title>Issued</title>
+  <link>https://example.org/articles/s2</link><dcterms:issued>2024-05-02</dcterms:issued></item>
+<item rdf:about="https://example.org/articles/s3"><title>Issued and dc:date</title>
+  <link>https://example.org/articles/s3</link><dc:date>2024-05-03T10:00:00Z</dc:date>
+  <dcterms:issued>2024-05-02</dcterms:issued></item>
+</rdf:RDF>"""
+
+
+def _identity(entries):
+    return [(e.fingerprint, e.published_at, e.link, e.canonical_key) for e in entries]
+
+
+class ParserParityTest(unittest.TestCase):
+    def assert_same(self, body: bytes) -> None:
+        expected = _identity(parse_feed_bytes(body, FEED_URL))
+        self.assertTrue(expected)
+        self.assertEqual(_identity(parse_feed_stream(body, FEED_URL)), expected)
+
+    def test_rss2(self):
+        self.assert_same(RSS2)
+
+    def test_atom(self):
+        self.assert_same(ATOM)
+
+    def test_rdf(self):
+        self.assert_same(RDF)
+
+    def test_dc_date_is_not_a_publish_date(self):
+        entries = parse_feed_stream(RDF, FEED_URL)
+        self.assertIsNone(entries[0].published_at)
+        self.assertEqual(entries[2].published_at.day, 2)
+
+
+# The same paper in two feeds: one gives the DOI, the other a tracked DOI link.
+DOI_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/"><channel><title>t</title>
+<item><title>A paper</title><link>https://example.org/articles/s1</link>
+  <prism:doi>10.1038/s41586-024-0001-1</prism:doi></item>
+</channel></rss>"""
+
+DOI_LINK_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>A paper (preprint)</title><link>https://doi.org/10.1038/s41586-024-0001-1?utm_source=rss#abstract</link></item>
+</channel></rss>"""
+
+
+class CanonicalKeyTest(unittest.TestCase):
+    def test_doi_from_link_drops_query_and_fragment(self):
+        expected = _canonical_key("", "", "", doi="10.1038/s41586-024-0001-1")
+        for parse in (parse_feed_bytes, parse_feed_stream):
+            (direct,) = parse(DOI_FEED, FEED_URL)
+            (linked,) = parse(DOI_LINK_FEED, FEED_URL)
+            self.assertEqual(direct.canonical_key, expected, parse.__name__)
+            self.assertEqual(linked.canonical_key, expected, parse.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
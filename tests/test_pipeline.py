@@ -0,0 +1,96 @@
+"""A failing stage must end the pipelined cycle with its error, not hang it."""
+
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.benchmark import _FeedHandler, _quiet, _start, make_feed
+from src.rss_email.config import Settings, _build_url_maps
+from src.rss_email.db import create_session_factory
+from src.rss_email.email_client import EmailClient
+from src.rss_email.workflow import run_cycle
+from src.smtp_sink import make_server
+
+FEEDS = 40
+TIMEOUT = 30
+
+
+class PipelineFailureTest(unittest.TestCase):
+    def setUp(self):
+        _FeedHandler.feeds = {f"/feed{i}.xml": make_feed(f"feed{i}", 5) for i in range(FEEDS)}
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        self.http.daemon_threads = True
+        # The failed cycle drops connections mid-body; that is expected here.
+        self.http.handle_error = lambda request, client_address: None
+        self.smtp = make_server()
+        _start(self.http)
+        _start(self.smtp)
+        self.workdir = tempfile.mkdtemp(prefix="rss_test_")
+
+    def tearDown(self):
+        self.http.shutdown()
+        self.smtp.shutdown()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def settings(self, groups, recipients, **kw) -> Settings:
+        url_to_group, urls = _build_url_maps(groups)
+        return Settings(
+            rss_urls=urls,
+            rss_groups=groups,
+            url_to_group=url_to_group,
+            group_recipients=recipients,
+            database_url=f"sqlite:///{self.workdir}/test.db",
+            smtp_host="127.0.0.1",
+            smtp_port=self.smtp.server_address[1],
+            smtp_user="",
+            smtp_pass="",
+            smtp_sender="test@example.org",
+            mail_subject_prefix="[Test]",
+            batch_limit=20,
+            enable_schedule=False,
+            schedule_time="08:30",
+            schedule_tz="UTC",
+            smtp_starttls=False,
+            **kw,
+        )
+
+    def test_send_stage_error_is_raised(self):
+        # The first group has no recipients, so planning its digest raises
+        # while most feeds are still waiting to be stored. Stream mode leaves
+        # parsing to the writer, so fetched feeds pile up in the queue.
+        base = f"http://127.0.0.1:{self.http.server_address[1]}"
+        groups = {"Orphan": [f"{base}/feed0.xml"], "Rest": [f"{base}/feed{i}.xml" for i in range(1, FEEDS)]}
+        recipients = {g: {"to": ["test@example.org"], "cc": [], "bcc": []} for g in ("Rest", "Default")}
+        settings = self.settings(groups, recipients, pipeline_queue_size=1, feed_parser="stream")
+        SessionLocal = create_session_factory(settings.database_url)
+        client = EmailClient(settings.smtp_host, settings.smtp_port, "", "", settings.smtp_sender, starttls=False)
+
+        outcome = {}
+
+        def cycle():
+            try:
+                with SessionLocal() as session:
+                    run_cycle(settings, session, client)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=cycle, daemon=True)
+        with _quiet():
+            thread.start()
+            thread.join(TIMEOUT)
+        self.assertFalse(thread.is_alive(), f"cycle did not finish within {TIMEOUT}s")
+        self.assertIsInstance(outcome.get("error"), ValueError)
+        self.assertIn("Orphan", str(outcome["error"]))
+
+
+if __name__ == "__main__":
+    unittest.main()